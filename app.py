@@ -1,9 +1,7 @@
-import os, sys, datetime, time, dash
+import os
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output
+from dash import dcc, html, ctx, Input, Output, Patch, no_update
 
-import pandas as pd
-import numpy as np
 import logging
 
 # Configure logging
@@ -13,29 +11,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 2) Import specific chart modules
-from charts.chart_1_multi import create_multi_weight_scatter
-from charts.chart_2_time_vs_weight_2d import create_time_vs_weight_2d
-from charts.chart_3_time_circles import create_am_pm_radial_time_plots
-from charts.chart_4_day_vs_time import create_day_vs_time_of_day
-from charts.chart_5_rest_time import create_rest_time_histogram
-from charts.chart_6_day_week_time import create_day_of_week_vs_weight_with_labels
-from charts.chart_6_day_week_time import create_day_of_week_vs_time_am_pm
-from charts.chart_9_fft import create_fft_analysis
-from charts.chart_10_color_coded_histogram import create_color_coded_histogram
-
-from charts.six_multibool import create_boolean_grip_heatmap
-from charts.chart_7_1D_histograms import create_histogram_with_toggles
-from charts.chart_8_time_bingo import create_time_bingo
-
-from utils.data import load_data, is_data_stale
-
-
-# Compute "Day number: X"
-start_date = datetime.datetime(2021, 12, 29)
-today = datetime.datetime.today()
-delta = today - start_date
-day_number = delta.days
+# 2) Chart modules are imported lazily by the figure registry ("module:function"
+#    builders), so a worker can start serving before sklearn/scipy are loaded.
+from utils.data import load_clean_data, summarize, refresh_data, file_digest, LiftData, LOCAL_CSV
+from utils.registry import FigureRegistry
+from utils.refresh import LiveRegistry, start_refresher
+from utils.serving import CachedPayloadDash, EncodedPayload, callback_response, gzip_response
+from utils.decimate import MAX_POINTS, relayout_x_range, widen_range
 
 
 # -------------------------------------------------------------------------
@@ -46,147 +28,163 @@ CSV_URL = (
     "1V0sk1rLHvYOfzpLnLOgzEi5eeOkRfzAHQqQ0AegjlOI"
     "/export?format=csv&gid=0"
 )
-LOCAL_CSV = "data/local_data.csv"
 
-# check if local csv exists
-if not os.path.exists(LOCAL_CSV):
-    print("Local CSV does not exist, creating it now...")
-    df = load_data(CSV_URL)
-    df.to_csv(LOCAL_CSV, index=False)
-# -------------------------------------------------------------------------
-# 2) Load/Cache Data
-# -------------------------------------------------------------------------
-if is_data_stale(LOCAL_CSV):
-    df = pd.read_csv(CSV_URL)
-    df.to_csv(LOCAL_CSV, index=False)
-else:
-    df = pd.read_csv(LOCAL_CSV)
-
-# Debug: initial load shape
-initial_count = len(df)
-logger.info("Loaded data: source=%s rows=%d columns=%d", LOCAL_CSV, df.shape[0], df.shape[1])
-
-# Replace deprecated applymap with trimming only object/string columns
-#df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-str_cols = df.select_dtypes(include=["object"]).columns
-if len(str_cols) > 0:
-    df[str_cols] = df[str_cols].apply(lambda s: s.str.strip())
-
-# Now filter out rows that contain either an empty string or "#VALUE!" in any column.
-mask = df.apply(lambda row: not row.astype(str).isin(["", " ", "#VALUE!"]).any(), axis=1)
-df = df[mask]
-logger.info("After trimming & masking: rows=%d (removed %d)", len(df), initial_count - len(df))
-
-# Convert some columns to numeric if they exist
-for col in ["Day Number", "Average Weight", "Top Set Weight", "Day"]:
-    if col in df.columns:
-        before = df[col].notna().sum()
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-        after = df[col].notna().sum()
-        logger.info("Converted column '%s' to numeric: non-null before=%d after=%d", col, before, after)
-
-# Record shape before dropna
-shape_before_drop = df.shape
-df = df.dropna(subset=["Top Set Weight"])
-logger.info("After dropna(['Top Set Weight']): rows=%d (dropped %d)", len(df), shape_before_drop[0] - len(df))
-
-# Compute "Most Recent Lift: YxZ" (robust to NaNs)
-most_recent_date = "N/A"
-if 'Top Set Weight' in df.columns and 'Number of Reps' in df.columns:
-    valid_mask = df['Top Set Weight'].notna() & df['Number of Reps'].notna()
-    if valid_mask.any():
-        last = df.loc[valid_mask].iloc[-1]
-        most_recent_weight = last['Top Set Weight']
-        most_recent_reps = last['Number of Reps']
-        try:
-            most_recent_lift = f"{int(most_recent_weight)}lbs x{int(most_recent_reps)}"
-        except (ValueError, TypeError):
-            most_recent_lift = "N/A"
-        most_recent_date_raw = last.get('Date', None)
-        if pd.notna(most_recent_date_raw):
-            try:
-                most_recent_date = pd.to_datetime(str(most_recent_date_raw), format="%Y%m%d").strftime("%m.%d.%y")
-            except Exception:
-                try:
-                    most_recent_date = pd.to_datetime(most_recent_date_raw).strftime("%m.%d.%y")
-                except Exception:
-                    most_recent_date = str(most_recent_date_raw)
-    else:
-        most_recent_lift = "N/A"
-        most_recent_date = "N/A"
-else:
-    most_recent_lift = "N/A"
-    most_recent_date = "N/A"
-# Compute "Total Weight Lifted: W" (ignore NaNs)
-if 'Top Set Weight' in df.columns and 'Number of Reps' in df.columns:
-    total_weight_lifted = int((df['Top Set Weight'].fillna(0) * df['Number of Reps'].fillna(0)).sum())
-else:
-    total_weight_lifted = "N/A"
+# Set PHDED_WARMUP=0 to build every figure on first request instead of in a
+# background thread at startup.
+WARMUP = os.environ.get("PHDED_WARMUP", "1") != "0"
+
+# Seconds between background checks of the sheet for new lifts; 0 disables
+# them. New data is picked up without restarting the worker.
+REFRESH_INTERVAL = int(os.environ.get("PHDED_REFRESH_INTERVAL", "3600"))
+
+# Entries needed to render the initial page. Everything below the fold is
+# filled in by the callbacks in LAZY_GRAPHS once the page has loaded.
+ABOVE_THE_FOLD = ["data", "lift", "summary", "fig_multi", "layout_payload"]
+
+# Graph id -> registry entry, in page order
+LAZY_GRAPHS = {
+    "time-weight-graph": "fig_2d_hist",
+    "graph-1": "fig_time_circular_am",
+    "graph-2": "fig_time_circular_pm",
+    "rest-time-graph": "fig_rest_time",
+    "day-time-graph": "fig_day_vs_time_of_day",
+    "dow-time-graph": "fig_dwt",
+    "dow-weight-graph": "fig_dwt2",
+    "histogram-graph": "fig_oneday",
+    "color-hist-graph": "fig_color_hist",
+    "time-bingo-graph": "fig_time_bingo",
+    "spectrogram-graph": "fig_spectrogram",
+}
+# Registry entry holding each lazy loader's encoded callback response
+LAZY_RESPONSES = {f"{graph_id}.figure": f"{name}_response" for graph_id, name in LAZY_GRAPHS.items()}
+
+# Transparent, axis-less figure shown until a lazy graph has been filled in
+EMPTY_FIGURE = {
+    "data": [],
+    "layout": {
+        "paper_bgcolor": "rgba(0,0,0,0)",
+        "plot_bgcolor": "rgba(0,0,0,0)",
+        "xaxis": {"visible": False},
+        "yaxis": {"visible": False},
+    },
+}
 
 
 # -------------------------------------------------------------------------
-# Build Figures (calling each chart module)
-fig_multi = create_multi_weight_scatter(df)
-fig_bool = create_boolean_grip_heatmap(df)
-fig_oneday = create_histogram_with_toggles(df)
-df2 = df.dropna(subset=["Time"])
-
-logger.info("df for time-based charts (df2): rows=%d (original df rows=%d)", len(df2), len(df))
-
-fig_2d_hist = create_time_vs_weight_2d(df2)
-fig_time_circular_am,fig_time_circular_pm = create_am_pm_radial_time_plots(df2)
-fig_day_vs_time_of_day = create_day_vs_time_of_day(df2)
-fig_rest_time = create_rest_time_histogram(df2)
-
-# Wrap the color-coded histogram creation with diagnostics
-try:
-    logger.info("Creating color-coded histogram with df rows=%d", len(df))
-    fig_color_hist = create_color_coded_histogram(df)
-except Exception as exc:
-    logger.exception("create_color_coded_histogram failed: %s", exc)
-    # Dump a small debug CSV and a short summary to help diagnose
-    debug_csv = "debug_df_before_color_hist.csv"
-    df.to_csv(debug_csv, index=False)
-    logger.info("Wrote debug CSV: %s (rows=%d)", debug_csv, len(df))
-    # Provide a fallback empty figure so the app can continue to run
-    import plotly.graph_objects as go
-    fig_color_hist = go.Figure()
-    fig_color_hist.add_annotation(
-        text=f"Error creating color histogram: {exc}",
-        xref="paper", yref="paper", x=0.5, y=0.5,
-        showarrow=False, font=dict(color="#FFFFFF")
-    )
-
-fig_fft = create_fft_analysis(df)
-
-fig_dwt2 = create_day_of_week_vs_weight_with_labels(df)
-fig_dwt = create_day_of_week_vs_time_am_pm(df)
-fig_time_bingo, stat_results = create_time_bingo(df2)
-
-
-number_of_empty_rows_before_today = day_number - len(df)
-
-empty_rows_message = (
-    html.P(
-        f"Note: {number_of_empty_rows_before_today:,} lifts are not yet entered",
-        className="text-center fs-4"  # fs-4 for larger text
-    )
-    if number_of_empty_rows_before_today != 0
-    else None
-)
-
-#df["Rest"] = (24-last_days_lift)+Current_daysLift (all but first day)
-
-#save df to csv
-#df.to_csv("processed.csv")
-# ... figure_top_set = create_top_set_figure(df), etc.
+# 2) Load/Cache Data
+# -------------------------------------------------------------------------
+def load_lift_data():
+    return load_clean_data(CSV_URL, LOCAL_CSV)
+
+
+def full_range_fft(df, spectra):
+    """The FFT figure over every recorded day, as first shown under the slider."""
+    from charts.chart_9_fft import create_fft_analysis
+    return create_fft_analysis(df, df["Day Number"].min(), df["Day Number"].max(), spectra=spectra)
+
+
+def spectrogram(df, spectra):
+    """The sliding-window spectrogram, sharing the FFT figure's interpolated series."""
+    from charts.chart_9_fft import create_fft_spectrogram
+    return create_fft_spectrogram(df, spectra=spectra)
+
+
+def encoded_figure(graph_id):
+    """Registry builder: a figure encoded as the callback response that fills in graph_id."""
+    def _encode(fig):
+        return EncodedPayload.from_obj(callback_response(graph_id, "figure", fig))
+    return _encode
+
+
+def unavailable(exc):
+    """
+    Registry fallback for data behind the interactive callbacks: store None,
+    so the failure is logged once and the callbacks leave their figure as is.
+    """
+    return None
+
+
+def placeholder(title, count=1, extra=()):
+    """
+    Registry fallback: an annotated placeholder figure (or a tuple of them,
+    followed by extra values, for builders that return several results).
+    """
+    def _fallback(exc):
+        from charts.placeholder import create_placeholder_figure
+        figs = [create_placeholder_figure(f"Error creating {title}: {exc}") for _ in range(count)]
+        return tuple(figs) + tuple(extra) if count > 1 or extra else figs[0]
+    return _fallback
+
+
+def build_registry(previous=None):
+    """
+    Register the data pipeline and every figure; nothing is built yet. When
+    replacing a previous registry, entries whose inputs are unchanged are
+    taken over from it instead of being rebuilt.
+    """
+    registry = FigureRegistry(previous)
+    registry.register("data", load_lift_data)
+    # Time/date columns parsed once per data version and shared by every chart
+    registry.register("lift", LiftData.from_frame, ["data"])
+    registry.register("summary", summarize, ["data"])
+
+    # Build Figures (calling each chart module). Each chart gets its own
+    # copy-on-write view of the lift frame ("lift.frame") or of the rows
+    # with a recorded Time ("lift.timed"); nothing is copied up front. A
+    # chart that fails is logged and replaced by an annotated placeholder.
+    registry.register("fig_multi", "charts.chart_1_multi:create_multi_weight_scatter", ["lift.frame"],
+                      fallback=placeholder("weight scatter"))
+    # Full-resolution series behind fig_multi, for the zoom callback
+    registry.register("multi_series", "charts.chart_1_multi:multi_weight_series", ["lift.frame"],
+                      fallback=unavailable)
+    registry.register("fig_bool", "charts.six_multibool:create_boolean_grip_heatmap", ["lift.frame"],
+                      fallback=placeholder("grip heatmap"))
+    registry.register("fig_oneday", "charts.chart_7_1D_histograms:create_histogram_with_toggles", ["lift.frame"],
+                      fallback=placeholder("histograms"))
+    registry.register("fig_2d_hist", "charts.chart_2_time_vs_weight_2d:create_time_vs_weight_2d", ["lift.timed"],
+                      fallback=placeholder("time vs. weight histogram"))
+    registry.register("fig_time_circular", "charts.chart_3_time_circles:create_am_pm_radial_time_plots", ["lift.timed"],
+                      fallback=placeholder("time of day plots", count=2))
+    registry.register("fig_time_circular_am", lambda figs: figs[0], ["fig_time_circular"])
+    registry.register("fig_time_circular_pm", lambda figs: figs[1], ["fig_time_circular"])
+    registry.register("fig_day_vs_time_of_day", "charts.chart_4_day_vs_time:create_day_vs_time_of_day", ["lift.timed"],
+                      fallback=placeholder("day vs. time of day plot"))
+    registry.register("fig_rest_time", "charts.chart_5_rest_time:create_rest_time_histogram", ["lift.timed"],
+                      fallback=placeholder("rest time histogram"))
+    registry.register("fig_color_hist", "charts.chart_10_color_coded_histogram:create_color_coded_histogram", ["lift.frame"],
+                      fallback=placeholder("color histogram"))
+    registry.register("fig_dwt2", "charts.chart_6_day_week_time:create_day_of_week_vs_weight_with_labels", ["lift.frame"],
+                      fallback=placeholder("day of week vs. weight heatmap"))
+    registry.register("fig_dwt", "charts.chart_6_day_week_time:create_day_of_week_vs_time_am_pm", ["lift.frame"],
+                      fallback=placeholder("day of week vs. time heatmap"))
+    registry.register("time_bingo", "charts.chart_8_time_bingo:create_time_bingo", ["lift.timed"],
+                      fallback=placeholder("bingo chart", extra=(None,)))
+    registry.register("fig_time_bingo", lambda result: result[0], ["time_bingo"])
+    registry.register("stat_results", lambda result: result[1], ["time_bingo"])
+    # Interpolated daily series (with its memoized spectra) behind the FFT slider
+    registry.register("fft_spectra", "charts.chart_9_fft:FFTSpectra", ["lift.frame"],
+                      fallback=unavailable)
+    registry.register("fig_fft", full_range_fft, ["lift.frame", "fft_spectra"],
+                      fallback=placeholder("frequency analysis"))
+    # Every slider window at once, from the same interpolated series
+    registry.register("fig_spectrogram", spectrogram, ["lift.frame", "fft_spectra"],
+                      fallback=placeholder("spectrogram"))
+
+    # The lazy loaders' responses, serialized and gzipped once per data version
+    for graph_id, name in LAZY_GRAPHS.items():
+        registry.register(LAZY_RESPONSES[f"{graph_id}.figure"], encoded_figure(graph_id), [name])
+
+    # The page layout serialized and gzipped once per data version
+    registry.register("layout_payload", lambda *_: EncodedPayload.from_obj(serve_layout(registry)),
+                      ["data", "summary", "fig_multi"])
+    return registry
 
 
 """
 ############################
 To Do
 Plot weight & frequency & lifting time distribution vs day of the week!
-	
+
 
 Fix bimodal guassian distribution
 Fix Bingo plot, on hover = show selected points on # vs day plot (#1)
@@ -194,20 +192,99 @@ Fix Time of Day, if desired toggle switch for pure histogram vs circular heatmap
 Need to fix time parser off by one error - possibly issue due to daylight savings time
 'answer the question - what new information do i convey by plotting this?'
 """
-# 3) Define the Dash app
-#app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
-#app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[dbc.themes.DARKLY],
-    title="PhDeD",
-    meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1.0"}]
-)
-server = app.server
+
+
+def lazy_section(section_id, *children):
+    """
+    Fixed-height container whose "<section_id>-visible" store is set by
+    assets/lazy_sections.js when it first scrolls into view; callbacks
+    listening to that store fill in the section's content.
+    """
+    return html.Div(
+        [dcc.Store(id=f"{section_id}-visible"), *children],
+        className="lazy-section",
+        **{"data-lazy-store": f"{section_id}-visible"},
+    )
+
+
+def lazy_graph(graph_id, **kwargs):
+    """dcc.Graph that starts empty and is filled in by its LAZY_GRAPHS callback once visible."""
+    return lazy_section(
+        graph_id,
+        dcc.Loading(
+            dcc.Graph(id=graph_id, figure=EMPTY_FIGURE, **kwargs),
+            type="circle",
+        ),
+    )
+
+
+def stats_paragraphs(stat_results):
+    if stat_results is None:
+        # The bingo chart (which computes these) failed; its placeholder explains why
+        return [
+            html.H4("Statistical Analysis of Lift Times", style={"fontWeight": "bold"}),
+            html.P("Statistics are unavailable."),
+        ]
+    return [
+            html.H4("Statistical Analysis of Lift Times", style={"fontWeight": "bold"}),
+            html.P(
+                "The chi-square test is a statistical method used to determine whether the observed distribution of data significantly differs "
+                "from an expected theoretical distribution. The chi-square statistic quantifies the difference between observed and expected frequencies. "
+                "The associated p-value represents the probability of observing data as extreme as the actual data, assuming that the null hypothesis "
+                "(typically a uniform or specified distribution) is correct. A small p-value (commonly less than 0.05) provides evidence that the observed "
+                "data deviate significantly from the expected distribution."
+            ),
+            html.P(
+                "For example, the minute-level data were tested for uniformity across the 60 minutes within an hour. "
+                f"The resulting chi-square statistic was {stat_results['minutes_uniform']['chi2']:.2f} with a p-value of "
+                f"{stat_results['minutes_uniform']['p_value']:.3e}. Given this relatively large p-value, the data do not show "
+                "significant deviation from a uniform distribution at the minute level."
+            ),
+            html.P(
+                "In contrast, the hourly data were analyzed for uniformity across the 24 hours of the day. "
+                f"This resulted in a chi-square statistic of {stat_results['hours_uniform']['chi2']:.2f} and a very small p-value "
+                f"({stat_results['hours_uniform']['p_value']:.3e}), indicating strong evidence against uniform distribution. "
+                "Thus, certain hours exhibit significantly higher lift activity than others."
+            ),
+            html.P(
+                "Additionally, the hourly data were tested against a single Gaussian (normal) distribution characterized by the dataset's mean and "
+                "standard deviation. This produced a chi-square statistic of "
+                f"{stat_results['hours_gaussian']['chi2']:.2f} with a small p-value ({stat_results['hours_gaussian']['p_value']:.3e}), "
+                "strongly suggesting that lift times do not conform to a simple Gaussian distribution."
+            ),
+            html.P(
+                "Finally, Gaussian Mixture Models (GMM) were used to evaluate whether lift times exhibited multimodal patterns, "
+                "meaning multiple distinct periods of increased lift activity throughout the day. Models with 1 to 5 Gaussian components "
+                "were compared using the Bayesian Information Criterion (BIC), a metric balancing goodness-of-fit against model complexity. "
+                f"The optimal model contained {stat_results['hours_multimodal']['best_n_components']} components, indicating multiple peaks of lift activity. "
+                "The relative support for models with differing numbers of peaks was measured using differences in BIC values (ΔBIC), where larger positive ΔBIC values indicate less support. "
+                "The ΔBIC values for each alternative model tested were: "
+                f"{'; '.join([f'{n}-component: ΔBIC={delta_bic:.1f}' for n, delta_bic in stat_results['hours_multimodal']['delta_bic'].items() if n != stat_results['hours_multimodal']['best_n_components']])}. "
+                "The identified peaks occur at approximately "
+                f"{', '.join(f'{peak:.1f}' for peak in stat_results['hours_multimodal']['peaks'])} hours."
+            ),
+    ]
+
 
 # 4) Layout
-# 4) Layout
-app.layout = dbc.Container(
+def serve_layout(registry):
+    # Only the header and the first chart are built before the page is sent
+    df = registry.get("data")
+    summary = registry.get("summary")
+    fig_multi = registry.get("fig_multi")
+
+    number_of_empty_rows_before_today = summary["missing_lifts"]
+
+    empty_rows_message = (
+        html.P(
+            f"Note: {number_of_empty_rows_before_today:,} lifts are not yet entered",
+            className="text-center fs-4"  # fs-4 for larger text
+        )
+        if number_of_empty_rows_before_today != 0
+        else None
+    )
+
+    return dbc.Container(
     fluid=True,
     className="fs-5",  # Increase font size everywhere
     children=[
@@ -217,7 +294,7 @@ app.layout = dbc.Container(
                 width=12
             )
         ),
-        
+
 
 
         dbc.Row(
@@ -226,16 +303,16 @@ app.layout = dbc.Container(
                     [
 
 
-                        
+
                         html.P(
                             [
-                                f"{day_number} Days",
+                                f"{summary['day_number']} Days",
                                 html.Br(),
                                 #html.Span(" | ", style={"margin": "0 20px"}),
-                                f"Most Recent Lift: {most_recent_lift} on {most_recent_date}",
+                                f"Most Recent Lift: {summary['most_recent_lift']} on {summary['most_recent_date']}",
                                 html.Br(),
                                 #html.Span(" | ", style={"margin": "0 20px"}),
-                                f"Cumulative Top Set Weight Lifted: {total_weight_lifted:,} lbs",
+                                f"Cumulative Top Set Weight Lifted: {summary['total_weight_lifted']:,} lbs",
                             ],
                             className="text-center fs-4"  # fs-4 for larger text
                         ),
@@ -306,11 +383,11 @@ app.layout = dbc.Container(
                 )
             ]
         ),
-        
+
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_2d_hist,
+                lazy_graph(
+                    "time-weight-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -322,17 +399,15 @@ app.layout = dbc.Container(
         dbc.Row(
             [
                 dbc.Col(
-                    dcc.Graph(
-                        id='graph-1',
-                        figure=fig_time_circular_am,
+                    lazy_graph(
+                        'graph-1',
                         className="responsive-graph"
                     ),
                     xs=12, sm=12, md=6, lg=6, xl=6  # Full width on xs/sm, half-width on md+
                 ),
                 dbc.Col(
-                    dcc.Graph(
-                        id='graph-2',
-                        figure=fig_time_circular_pm,
+                    lazy_graph(
+                        'graph-2',
                         className="responsive-graph"
                     ),
                     xs=12, sm=12, md=6, lg=6, xl=6
@@ -343,8 +418,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_rest_time,
+                lazy_graph(
+                    "rest-time-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -354,8 +429,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_day_vs_time_of_day,
+                lazy_graph(
+                    "day-time-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -368,8 +443,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_dwt,
+                lazy_graph(
+                    "dow-time-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -379,8 +454,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_dwt2,
+                lazy_graph(
+                    "dow-weight-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -390,8 +465,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_oneday,
+                lazy_graph(
+                    "histogram-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}
                 ),
@@ -401,8 +476,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    figure=fig_color_hist,
+                lazy_graph(
+                    "color-hist-graph",
                     style={"width": "100%", "height": "auto"}
                 ),
                 width=12
@@ -411,9 +486,8 @@ app.layout = dbc.Container(
 
         dbc.Row(
             dbc.Col(
-                dcc.Graph(
-                    id="time-bingo-graph",
-                    figure=fig_time_bingo,
+                lazy_graph(
+                    "time-bingo-graph",
                      style={"width": "100%", "height": "auto"}
                     #style={"paddingLeft": "10%", "paddingRight": "10%", "height": "700px"}  # 10% L/R padding, taller plot
                 ),
@@ -422,13 +496,13 @@ app.layout = dbc.Container(
         ),
         dbc.Row(
             dbc.Col(
-                html.Div([
+                lazy_section("fft-graph",
                     dcc.Graph(
                         id='fft-graph',
-                        figure=fig_fft,
+                        figure=EMPTY_FIGURE,
                         style={"width": "100%", "height": "auto"}
                     ),
-                    html.H4("Select Date Range for Frequency Analysis", 
+                    html.H4("Select Date Range for Frequency Analysis",
                            className="text-center mt-4 mb-2"),
                     dcc.RangeSlider(
                         id='fft-day-range',
@@ -443,51 +517,22 @@ app.layout = dbc.Container(
                         allowCross=False
                     ),
                     html.Div(style={"height": "20px"})  # Add some bottom spacing
-                ]),
+                ),
+                width=12
+            )
+        ),
+        dbc.Row(
+            dbc.Col(
+                lazy_graph(
+                    "spectrogram-graph",
+                    style={"width": "100%", "height": "auto"}
+                ),
                 width=12
             )
         ),
 dbc.Row(
     dbc.Col(
-        html.Div([
-            html.H4("Statistical Analysis of Lift Times", style={"fontWeight": "bold"}),
-            html.P(
-                "The chi-square test is a statistical method used to determine whether the observed distribution of data significantly differs "
-                "from an expected theoretical distribution. The chi-square statistic quantifies the difference between observed and expected frequencies. "
-                "The associated p-value represents the probability of observing data as extreme as the actual data, assuming that the null hypothesis "
-                "(typically a uniform or specified distribution) is correct. A small p-value (commonly less than 0.05) provides evidence that the observed "
-                "data deviate significantly from the expected distribution."
-            ),
-            html.P(
-                "For example, the minute-level data were tested for uniformity across the 60 minutes within an hour. "
-                f"The resulting chi-square statistic was {stat_results['minutes_uniform']['chi2']:.2f} with a p-value of "
-                f"{stat_results['minutes_uniform']['p_value']:.3e}. Given this relatively large p-value, the data do not show "
-                "significant deviation from a uniform distribution at the minute level."
-            ),
-            html.P(
-                "In contrast, the hourly data were analyzed for uniformity across the 24 hours of the day. "
-                f"This resulted in a chi-square statistic of {stat_results['hours_uniform']['chi2']:.2f} and a very small p-value "
-                f"({stat_results['hours_uniform']['p_value']:.3e}), indicating strong evidence against uniform distribution. "
-                "Thus, certain hours exhibit significantly higher lift activity than others."
-            ),
-            html.P(
-                "Additionally, the hourly data were tested against a single Gaussian (normal) distribution characterized by the dataset's mean and "
-                "standard deviation. This produced a chi-square statistic of "
-                f"{stat_results['hours_gaussian']['chi2']:.2f} with a small p-value ({stat_results['hours_gaussian']['p_value']:.3e}), "
-                "strongly suggesting that lift times do not conform to a simple Gaussian distribution."
-            ),
-            html.P(
-                "Finally, Gaussian Mixture Models (GMM) were used to evaluate whether lift times exhibited multimodal patterns, "
-                "meaning multiple distinct periods of increased lift activity throughout the day. Models with 1 to 5 Gaussian components "
-                "were compared using the Bayesian Information Criterion (BIC), a metric balancing goodness-of-fit against model complexity. "
-                f"The optimal model contained {stat_results['hours_multimodal']['best_n_components']} components, indicating multiple peaks of lift activity. "
-                "The relative support for models with differing numbers of peaks was measured using differences in BIC values (ΔBIC), where larger positive ΔBIC values indicate less support. "
-                "The ΔBIC values for each alternative model tested were: "
-                f"{'; '.join([f'{n}-component: ΔBIC={delta_bic:.1f}' for n, delta_bic in stat_results['hours_multimodal']['delta_bic'].items() if n != stat_results['hours_multimodal']['best_n_components']])}. "
-                "The identified peaks occur at approximately "
-                f"{', '.join(f'{peak:.1f}' for peak in stat_results['hours_multimodal']['peaks'])} hours."
-            ),
-        ], style={"padding": "20px", "color": "#FFFFFF"}),
+        html.Div(id="bingo-stats", style={"padding": "20px", "color": "#FFFFFF"}),
         width=12
     )
 )
@@ -503,7 +548,7 @@ dbc.Row(
         #         width=12
         #     )
         # ),
-        
+
         #add extra padding at the bottom
         html.Div(style={"padding": "400px 0"})
 
@@ -511,62 +556,197 @@ dbc.Row(
 )
 
 
+# 5) Callbacks
+def register_callbacks(app, live):
+    # Every callback reads live.current once, so a request that is in flight
+    # during a data refresh is served entirely from the snapshot it started with.
+    def make_loader(name):
+        def load_figure(_):
+            return live.current.get(name)
+        return load_figure
+
+    # Each of these fires once, when its section first scrolls into view.
+    # CachedPayloadDash answers them from LAZY_RESPONSES; the callbacks are
+    # still registered so the page knows the dependencies
+    for graph_id, name in LAZY_GRAPHS.items():
+        app.callback(
+            Output(graph_id, "figure"),
+            Input(f"{graph_id}-visible", "data"),
+            prevent_initial_call=True
+        )(make_loader(name))
+
+    # The statistics sit under the bingo chart and are computed with it
+    @app.callback(
+        Output("bingo-stats", "children"),
+        Input("time-bingo-graph-visible", "data"),
+        prevent_initial_call=True
+    )
+    def load_stats(_):
+        return stats_paragraphs(live.current.get("stat_results"))
 
-@app.callback(
-    Output("multi-scatter-graph", "figure"),
-    [Input("metric-checklist", "value")]
-)
-def toggle_traces(selected_metrics):
-    # Start from the base figure
-    fig = create_multi_weight_scatter(df)
-
-    # The figure has 4 traces in this order:
-    #  0: Effective Weight
-    #  1: Average Weight
-    #  2: Top Set Weight
-    #  3: Number of Reps
-
-    # A helper mapping trace index -> metric name
-    trace_names = [
-        "Effective Weight",
-        "Average Weight",
-        "Top Set Weight",
-        "Number of Reps"
-    ]
+    @app.callback(
+        Output("multi-scatter-graph", "figure"),
+        [Input("metric-checklist", "value")]
+    )
+    def toggle_traces(selected_metrics):
+        # Only opacities, hover settings and the reps axis change, so send a
+        # Patch of those instead of re-serializing the whole history.
+        base = live.current.get("fig_multi")
+        patch = Patch()
+
+        # The figure has 4 traces in this order:
+        #  0: Effective Weight
+        #  1: Average Weight
+        #  2: Top Set Weight
+        #  3: Number of Reps
+        for i, trace in enumerate(base.data):
+            if trace.name in selected_metrics:
+                patch["data"][i]["opacity"] = 1.0
+                # Restore the hover settings from the base figure
+                patch["data"][i]["hoverinfo"] = trace.hoverinfo
+                patch["data"][i]["hovertemplate"] = trace.hovertemplate
+            else:
+                patch["data"][i]["opacity"] = 0.0
+                # Completely disable hover for invisible traces
+                patch["data"][i]["hoverinfo"] = "none"
+                patch["data"][i]["hovertemplate"] = None
+
+        # Toggle visibility of the second y-axis based on "Number of Reps" selection
+        patch["layout"]["yaxis2"]["visible"] = "Number of Reps" in selected_metrics
+        return patch
+
+
+
+    # Long histories are drawn decimated (utils.decimate); zooming in swaps
+    # in the full-resolution points around the visible range
+    @app.callback(
+        Output("multi-scatter-graph", "figure", allow_duplicate=True),
+        Input("multi-scatter-graph", "relayoutData"),
+        prevent_initial_call=True
+    )
+    def zoom_multi_scatter(relayout_data):
+        from charts.chart_1_multi import multi_weight_trace_data
+
+        x_range = relayout_x_range(relayout_data)
+        series = live.current.get("multi_series")
+        if x_range is None or series is None or len(series["x"]) <= MAX_POINTS:
+            # Not a zoom, the series failed to build, or the figure already holds every point
+            return no_update
+        x_range = None if x_range == "full" else widen_range(x_range, is_datetime=True)
+
+        patch = Patch()
+        for i, trace in enumerate(multi_weight_trace_data(series, x_range=x_range)):
+            patch["data"][i]["x"] = trace["x"]
+            patch["data"][i]["y"] = trace["y"]
+            patch["data"][i]["text"] = trace["text"]
+            if "marker.color" in trace:
+                patch["data"][i]["marker"]["color"] = trace["marker.color"]
+        return patch
+
+    @app.callback(
+        Output("fft-graph", "figure", allow_duplicate=True),
+        Input("fft-graph", "relayoutData"),
+        prevent_initial_call=True
+    )
+    def zoom_fft_series(relayout_data):
+        from charts.chart_9_fft import top_set_trace_data
+
+        # Only the top subplot ("xaxis") shows the decimated series
+        x_range = relayout_x_range(relayout_data, "xaxis")
+        df = live.current.get("lift").frame
+        if x_range is None or len(df) <= MAX_POINTS:
+            return no_update
+        x_range = None if x_range == "full" else widen_range(x_range)
+
+        top_set = top_set_trace_data(df, x_range=x_range)
+        patch = Patch()
+        patch["data"][0]["x"] = top_set["x"]
+        patch["data"][0]["y"] = top_set["y"]
+        return patch
+
+    @app.callback(
+        Output("fft-graph", "figure"),
+        [Input("fft-day-range", "value"), Input("fft-graph-visible", "data")],
+        prevent_initial_call=True
+    )
+    def update_fft_plot(day_range, _visible):
+        from charts.chart_9_fft import fft_range_update
+
+        registry = live.current
+        # The section scrolled into view: send the full-range figure
+        if ctx.triggered_id == "fft-graph-visible" or day_range is None:
+            return registry.get("fig_fft")
+
+        # A slider move only replaces the shaded range, the spectrum and the
+        # title; spectra are memoized per (start_day, end_day)
+        spectra = registry.get("fft_spectra")
+        if spectra is None:
+            # The figure is a placeholder; there is nothing to patch
+            return no_update
+        update = fft_range_update(spectra, day_range[0], day_range[1])
+        patch = Patch()
+        patch["data"][1]["x"] = update["shade_x"]
+        patch["data"][2]["x"] = update["periods"]
+        patch["data"][2]["y"] = update["magnitudes"]
+        patch["layout"]["title"]["text"] = update["title"]
+        return patch
 
-    # Adjust opacity of each trace
-    for i, trace_name in enumerate(trace_names):
-        if trace_name in selected_metrics:
-            fig.data[i].opacity = 1.0
-            # Restore the original hovertemplate if needed
-            # (assuming you stored it or know what it should be)
-        else:
-            fig.data[i].opacity = 0.0
-            # Completely disable hover for invisible traces
-            fig.data[i].hoverinfo = 'none'
-            fig.data[i].hoverlabel = None
-            fig.data[i].hovertemplate = None
 
+# 3) Define the Dash app
+def create_app():
+    """
+    Build the Dash app without loading any data. Data and figures live in a
+    per-process FigureRegistry: they are built on first request or, unless
+    PHDED_WARMUP=0, concurrently on a thread pool (PHDED_BUILD_WORKERS) by a
+    background warm-up thread started here; that includes the serialized
+    page layout. Every PHDED_REFRESH_INTERVAL seconds a second thread checks
+    the sheet and, if it changed, swaps in a rebuilt registry.
+    """
+    live = LiveRegistry(build_registry)
+
+    #app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
+    #app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
+    app = CachedPayloadDash(
+        __name__,
+        external_stylesheets=[dbc.themes.DARKLY],
+        title="PhDeD",
+        meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1.0"}],
+        # Otherwise Dash calls the layout function at assignment to validate
+        # callback ids, which would load the data at import time
+        suppress_callback_exceptions=True
+    )
+    # Page loads are answered from the current registry's serialized layout
+    # (with an ETag, so repeat visits get a 304); app.layout stays a function
+    # for Dash's own use
+    app.layout = lambda: serve_layout(live.current)
+    app.layout_payload = lambda: live.current.get("layout_payload")
+    # Likewise the lazy graphs' figures; every other callback is dispatched by Dash
+    app.callback_payload = lambda output: (
+        live.current.get(LAZY_RESPONSES[output]) if output in LAZY_RESPONSES else None
+    )
+    app.server.after_request(gzip_response)
+    register_callbacks(app, live)
 
-    # Toggle visibility of the second y-axis based on "Number of Reps" selection
-    if "Number of Reps" in selected_metrics:
-        fig.update_layout(yaxis2=dict(visible=True))
-    else:
-        fig.update_layout(yaxis2=dict(visible=False))
+    if WARMUP:
+        live.current.warm_up(ABOVE_THE_FOLD + ["stat_results", "fig_fft"] + list(LAZY_RESPONSES.values()))
 
-    return fig
+    if REFRESH_INTERVAL > 0:
+        last_digest = [file_digest(LOCAL_CSV)]
 
+        def sheet_changed():
+            refresh_data(CSV_URL, LOCAL_CSV)
+            digest = file_digest(LOCAL_CSV)
+            # Compare file contents rather than trusting refresh_data's count:
+            # another worker may already have written the update
+            changed, last_digest[0] = digest != last_digest[0], digest
+            return changed
 
+        start_refresher(live, sheet_changed, REFRESH_INTERVAL)
+    return app
 
-@app.callback(
-    Output("fft-graph", "figure"),
-    [Input("fft-day-range", "value")]
-)
-def update_fft_plot(day_range):
-    if day_range is None:
-        day_range = [df['Day Number'].min(), df['Day Number'].max()]
-    return create_fft_analysis(df, start_day=day_range[0], end_day=day_range[1])
 
+app = create_app()
+server = app.server
 
 
 # 6) Run
@@ -0,0 +1,63 @@
+// Lazy dashboard sections: tell the server to send a section's chart only
+// once it is about to scroll into view (see lazy_section() in app.py)
+(function() {
+    var STORE_ATTRIBUTE = 'data-lazy-store';
+    // Start loading a little before the section reaches the viewport
+    var ROOT_MARGIN = '300px 0px';
+
+    function reveal(section) {
+        var storeId = section.getAttribute(STORE_ATTRIBUTE);
+        if (!storeId || section._lazyRevealed) return true;
+        if (!(window.dash_clientside && window.dash_clientside.set_props &&
+              window.dash_stores && window.dash_stores.length)) {
+            return false;  // Dash renderer not ready yet
+        }
+        window.dash_clientside.set_props(storeId, {data: true});
+        section._lazyRevealed = true;
+        return true;
+    }
+
+    function revealWhenReady(section) {
+        if (reveal(section)) {
+            if (observer) observer.unobserve(section);
+        } else {
+            setTimeout(function() { revealWhenReady(section); }, 100);
+        }
+    }
+
+    var observer = null;
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                if (entry.isIntersecting) revealWhenReady(entry.target);
+            });
+        }, {rootMargin: ROOT_MARGIN});
+    }
+
+    function scan() {
+        document.querySelectorAll('[' + STORE_ATTRIBUTE + ']').forEach(function(section) {
+            if (section._lazyObserved) return;
+            if (observer) {
+                observer.observe(section);
+                section._lazyObserved = true;
+            } else {
+                // No IntersectionObserver (old browsers): load everything
+                section._lazyObserved = true;
+                revealWhenReady(section);
+            }
+        });
+    }
+
+    // Dash renders the layout after this script runs, so watch for sections
+    // being added to the page
+    var mutations = new MutationObserver(scan);
+    function start() {
+        mutations.observe(document.body, {childList: true, subtree: true});
+        scan();
+    }
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();
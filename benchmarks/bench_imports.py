@@ -0,0 +1,56 @@
+"""
+Cold-import time of the chart modules and the colour table, each measured
+in a fresh interpreter, with matplotlib.pyplot (which the charts used to
+import) for comparison.
+
+    python benchmarks/bench_imports.py [repeats]   # default 5
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+MODULES = [
+    "matplotlib.pyplot",
+    "utils.colors",
+    "charts.chart_1_multi",
+    "charts.chart_2_time_vs_weight_2d",
+    "charts.chart_4_day_vs_time",
+    "charts.chart_6_day_week_time",
+]
+
+
+def import_seconds(module):
+    """Seconds spent importing module in a new interpreter (excluding startup)."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for module in MODULES:
+        times = [import_seconds(module) for _ in range(repeats)]
+        if None in times:
+            print(f"{module:<36} not importable")
+            continue
+        print(f"{module:<36} median {statistics.median(times) * 1000:7.1f} ms")
+    pulls_in = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, charts.chart_1_multi, charts.chart_2_time_vs_weight_2d, "
+         "charts.chart_4_day_vs_time, charts.chart_6_day_week_time; "
+         "print('matplotlib' in sys.modules)"],
+        cwd=ROOT, capture_output=True, text=True,
+    ).stdout.strip()
+    print(f"charts import matplotlib: {pulls_in}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Time reading creation time and track sizes from MP4 headers with
+parsing/mp4_header.py against spawning ffprobe (when it is on PATH), on
+the synthetic clips of tests/test_mp4_header.py: a small moov around a
+multi-GB sparse mdat, in the layouts cameras and phones write (moov last or
+first, 32/64-bit box sizes, version 0/1 headers). Also checks that the
+reader recovers what was written; the malformed cases are in the tests.
+
+    python benchmarks/bench_mp4_header.py [files]   # default 200
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "parsing"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+from mp4_header import MP4_EPOCH_OFFSET, read_mp4_header  # noqa: E402
+from test_mp4_header import MDAT_BYTES, expected, write_clip  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    created0 = MP4_EPOCH_OFFSET + 1672531200  # 2023-01-01
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = []
+        for i in range(count):
+            path = os.path.join(tmp, f"clip{i:04d}.mp4")
+            created = created0 + i * 86400 + 3600 * (i % 14)
+            width, height = (3840, 2160) if i % 2 else (1080, 1920)
+            write_clip(path, created, width, height,
+                       moov_first=i % 3 == 0, version=i % 4 == 1, large_mdat=i % 5 == 0)
+            clips.append((path, expected(created, width, height)))
+
+        start = time.perf_counter()
+        for path, meta in clips:
+            assert read_mp4_header(path) == meta, path
+        native = time.perf_counter() - start
+        print(f"{count} clips of {MDAT_BYTES / 1024 ** 3:.0f} GB, all headers read back correctly")
+        print(f"{'mp4_header':<12} {native * 1000 / count:8.3f} ms/file")
+
+        if shutil.which("ffprobe") is None:
+            print("ffprobe not on PATH, skipping the comparison")
+            return
+        start = time.perf_counter()
+        for path, _ in clips:
+            subprocess.run(["ffprobe", "-v", "quiet", "-print_format", "json",
+                            "-show_format", "-show_streams", path],
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+        spawned = time.perf_counter() - start
+        print(f"{'ffprobe':<12} {spawned * 1000 / count:8.3f} ms/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Build and serialization cost of the per-lift scatter charts with the SVG
+(go.Scatter) and WebGL (go.Scattergl) backends, on synthetic histories of
+growing length. Browser-free: it measures what the server does and sends,
+not client-side drawing.
+
+    python benchmarks/bench_scatter_render.py [days ...]   # default 1500 15000 50000
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from charts.chart_1_multi import create_multi_weight_scatter  # noqa: E402
+from charts.chart_4_day_vs_time import create_day_vs_time_of_day  # noqa: E402
+from utils.data import START_DATE, as_lift_frame  # noqa: E402
+
+
+def synthetic_lifts(days, seed=0):
+    """One lift per day with the columns both charts read."""
+    rng = np.random.default_rng(seed)
+    day_number = np.arange(1, days + 1)
+    top = np.round(rng.normal(410, 10, days) / 5) * 5
+    reps = rng.integers(1, 4, days).astype(float)
+    dates = pd.Timestamp(START_DATE) + pd.to_timedelta(day_number - 1, unit="D")
+    return as_lift_frame(pd.DataFrame({
+        "Day Number": day_number,
+        "Date": dates.strftime("%Y%m%d").astype(int),
+        "Time": (rng.integers(6, 23, days) * 100 + rng.integers(0, 60, days)).astype(float),
+        "Grip": rng.choice(["M", "H"], days),
+        "Top Set Weight": top,
+        "Number of Reps": reps,
+        "Effective Weight": top * (1 + (reps - 1) / 30),
+        "Average Weight": pd.Series(top).rolling(30, min_periods=1).mean().to_numpy(),
+    }))
+
+
+def measure(build):
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter()
+    payload = fig.to_json()
+    done = time.perf_counter()
+    return (built - start) * 1000, (done - built) * 1000, len(payload)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1500, 15000, 50000]
+    # Untimed first build: imports and plotly's validator caches
+    create_multi_weight_scatter(synthetic_lifts(10))
+    create_day_vs_time_of_day(synthetic_lifts(10))
+    print(f"{'chart':<22} {'days':>7} {'backend':<7} {'build ms':>9} {'json ms':>8} {'bytes':>11}")
+    for days in sizes:
+        df = synthetic_lifts(days)
+        charts = {
+            # Full resolution, so the backends are compared on every point
+            "multi_weight_scatter": lambda r: create_multi_weight_scatter(df, max_points=days, renderer=r),
+            "day_vs_time_of_day": lambda r: create_day_vs_time_of_day(df, renderer=r),
+        }
+        for name, build in charts.items():
+            for renderer in ("svg", "webgl"):
+                build_ms, json_ms, size = measure(lambda: build(renderer))
+                print(f"{name:<22} {days:>7} {renderer:<7} {build_ms:>9.1f} {json_ms:>8.1f} {size:>11,}")
+
+
+if __name__ == "__main__":
+    main()
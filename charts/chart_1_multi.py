@@ -1,25 +1,30 @@
 # charts/multi_weight_scatter.py
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import math
-import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
+from utils.colors import VIRIDIS_RGB, VIRIDIS_SIZE
+from utils.data import as_lift_frame
+from utils.decimate import decimate_indices
+from utils.render import scatter_class
 
-def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
-    """
-    Builds a figure with 4 scatter traces of:
-      1) Effective Weight (colored by time of day using viridis colormap)
-      2) Average Weight
-      3) Top Set Weight
-      4) Number of Reps (on a secondary y-axis)
+# A colorscale whose stops sit exactly on the integer colour indices:
+# -1 -> grey, i -> VIRIDIS_RGB[i]
+TIME_COLORSCALE = [[0.0, "#808080"]] + [
+    [(i + 1) / VIRIDIS_SIZE, f"rgb({r}, {g}, {b})"] for i, (r, g, b) in enumerate(VIRIDIS_RGB)
+]
 
-    - No legend in the plot (showlegend=False).
-    - All traces start with low opacity, letting us toggle them on/off externally.
-    - Updated fonts to be larger for readability on any device.
-    """
+# Trace order in the figure; toggle_traces and the zoom callback rely on it
+METRICS = ["Effective Weight", "Average Weight", "Top Set Weight", "Number of Reps"]
+# Traces whose markers are coloured by time of day
+COLORED_METRICS = {"Effective Weight", "Top Set Weight"}
 
+def multi_weight_series(df: pd.DataFrame) -> dict:
+    """
+    Full-resolution arrays the multi-weight traces are drawn from, sorted by
+    date: "x" (dates), "text" (hover), "colors" (viridis index per point)
+    and one y array per metric.
+    """
     # Ensure needed columns
     needed_cols = [
         "Day Number", "Time", "Grip",
@@ -34,62 +39,84 @@ def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
     # Day Number 1 corresponds to 2021-12-29
     xvals = pd.to_datetime("2021-12-29") + pd.to_timedelta(df["Day Number"] - 1, unit="D")
 
+    # Clock time from the shared lift frame; times that are missing or not a
+    # valid HH:MM are shown grey and as "N/A"
+    lift = as_lift_frame(df)
+    hour = lift["Hour"].to_numpy()
+    minute = lift["Minute"].to_numpy()
+    valid = (hour >= 0) & (hour < 24) & (minute >= 0) & (minute < 60)
+
+    # Colour each point by time of day: one viridis LUT index per point
+    # (-1 = invalid) shared through the figure's coloraxis, rather than an
+    # rgb() string per point
+    minutes_since_midnight = np.where(valid, hour * 60 + minute, 0)
+    color_index = np.where(valid, np.minimum(minutes_since_midnight * VIRIDIS_SIZE // (24 * 60), VIRIDIS_SIZE - 1), -1)
+    colors = color_index.astype(int)
 
-    def format_time(time_val):
-        # Try converting time_val to a float
-        try:
-            numeric_time = float(time_val)
-        except (ValueError, TypeError):
-            return None
-        # Check if the numeric value is NaN
-        if math.isnan(numeric_time):
-            return None
-        # Convert to integer for formatting
-        time_int = int(numeric_time)
-        hour = time_int // 100
-        minute = time_int % 100
-        try:
-            dt = datetime.time(hour, minute)
-            # Also return the normalized time value (0 to 1) for colormap
-            minutes_since_midnight = hour * 60 + minute
-            normalized_time = minutes_since_midnight / (24 * 60)
-            return dt, normalized_time
-        except ValueError:
-            return None
-
-    # Custom hover text for additional info (only the time is now shown)
-    def hover_text(i):
-        time_result = format_time(df['Time'].iloc[i])
-        if time_result is None:
-            formatted_time = "N/A"
-        else:
-            formatted_time = time_result[0].strftime("%I:%M %p")
-            # Remove any leading zero
-            if formatted_time.startswith("0"):
-                formatted_time = formatted_time[1:]
-        return f"Time: {formatted_time}<br>"
-    
-    # Get normalized time values for colormap
-    time_values = [format_time(t) for t in df['Time']]
-    normalized_times = [t[1] if t is not None else -1 for t in time_values]
-    
-    # Create color array using viridis colormap for valid times, grey for invalid
-    colors = ['#808080' if t == -1 else f'rgb{tuple(int(x*255) for x in plt.cm.viridis(t)[:3])}' for t in normalized_times]
-
-    custom_hover = [hover_text(i) for i in range(len(df))]
+    # Custom hover text for additional info (only the time is shown), e.g. "Time: 4:42 PM<br>"
+    hour12 = pd.Series(np.where(valid, (hour + 11) % 12 + 1, 0).astype(int)).astype(str)
+    minute_str = pd.Series(np.where(valid, minute, 0).astype(int)).astype(str).str.zfill(2)
+    am_pm = pd.Series(np.where(hour < 12, " AM", " PM"))
+    custom_hover = np.where(valid, ("Time: " + hour12 + ":" + minute_str + am_pm + "<br>").to_numpy(), "Time: N/A<br>")
+
+    # Sorted by date so decimation sees a monotonic x (the sheet already is)
+    order = np.argsort(xvals.to_numpy(), kind="stable")
+    series = {
+        "x": pd.DatetimeIndex(xvals.to_numpy()[order]),
+        "text": custom_hover[order],
+        "colors": colors[order],
+    }
+    for metric in METRICS:
+        series[metric] = df[metric].to_numpy(dtype=float)[order]
+    return series
+
+def multi_weight_trace_data(series: dict, max_points: int = None, x_range=None) -> list:
+    """
+    Per-trace x/y/text (and marker colours) to draw, in METRICS order: the
+    points inside x_range (default: everything), decimated to at most
+    max_points per trace.
+    """
+    traces = []
+    for metric in METRICS:
+        idx = decimate_indices(series["x"], series[metric], max_points, x_range)
+        trace = {"x": series["x"][idx], "y": series[metric][idx], "text": series["text"][idx]}
+        if metric in COLORED_METRICS:
+            trace["marker.color"] = series["colors"][idx]
+        traces.append(trace)
+    return traces
+
+def create_multi_weight_scatter(df: pd.DataFrame, max_points: int = None, renderer: str = None) -> go.Figure:
+    """
+    Builds a figure with 4 scatter traces of:
+      1) Effective Weight (colored by time of day using viridis colormap)
+      2) Average Weight
+      3) Top Set Weight
+      4) Number of Reps (on a secondary y-axis)
+
+    - No legend in the plot (showlegend=False).
+    - All traces start with low opacity, letting us toggle them on/off externally.
+    - Updated fonts to be larger for readability on any device.
+    - Each trace is drawn with at most max_points points (default
+      utils.decimate.MAX_POINTS) over the full history.
+    - Traces are go.Scattergl instead of go.Scatter when utils.render picks
+      WebGL for that many points (renderer overrides PHDED_SCATTER_RENDERER).
+    """
+    eff, avg, top, reps = multi_weight_trace_data(multi_weight_series(df), max_points)
+    # One backend for all four traces, chosen by the longest
+    Scatter = scatter_class(max(len(trace["x"]) for trace in (eff, avg, top, reps)), renderer)
 
     # Trace 1: Effective Weight
-    trace_eff = go.Scatter(
-        x=xvals,
-        y=df["Effective Weight"],
+    trace_eff = Scatter(
+        x=eff["x"],
+        y=eff["y"],
         mode="markers",
         name="Effective Weight",
         marker=dict(
             opacity=1,
-            color=colors,
-            showscale=False
+            color=eff["marker.color"],
+            coloraxis="coloraxis",
         ),
-        text=custom_hover,
+        text=eff["text"],
         hovertemplate=(
             "%{x|%B %d %Y}<br>"
             "Effective Weight: %{y:.0f}<br>"
@@ -98,12 +125,12 @@ def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
     )
 
     # Trace 2: Average Weight (smoothed curve)
-    trace_avg = go.Scatter(
-        x=xvals,
-        y=df["Average Weight"],
+    trace_avg = Scatter(
+        x=avg["x"],
+        y=avg["y"],
         mode="lines",  # Connect points with a line
         name="Average Weight",
-        text=custom_hover,
+        text=avg["text"],
         hovertemplate=(
             "%{x|%B %d %Y}<br>"
             "Average Weight: %{y:.0f}<br>"
@@ -112,17 +139,17 @@ def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
     )
 
     # Trace 3: Top Set Weight
-    trace_top = go.Scatter(
-        x=xvals,
-        y=df["Top Set Weight"],
+    trace_top = Scatter(
+        x=top["x"],
+        y=top["y"],
         mode="markers",
         name="Top Set Weight",
         marker=dict(
             opacity=1,
-            color=colors,
-            showscale=False
+            color=top["marker.color"],
+            coloraxis="coloraxis",
         ),
-        text=custom_hover,
+        text=top["text"],
         hovertemplate=(
             "%{x|%B %d %Y}<br>"
             "Top Set Weight: %{y:.0f}<br>"
@@ -131,13 +158,13 @@ def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
     )
 
     # Trace 4: Number of Reps (secondary y-axis)
-    trace_reps = go.Scatter(
-        x=xvals,
-        y=df["Number of Reps"],
+    trace_reps = Scatter(
+        x=reps["x"],
+        y=reps["y"],
         mode="markers",
         name="Number of Reps",
         marker=dict(opacity=1),
-        text=custom_hover,
+        text=reps["text"],
         hovertemplate=(
             "%{x|%B %d %Y}<br>"
             "Reps: %{y:.0f}<br>"
@@ -163,6 +190,13 @@ def create_multi_weight_scatter(df: pd.DataFrame) -> go.Figure:
             bordercolor="rgba(255,255,255,0.3)"
         ),
         hovermode='closest',
+        # Grey for invalid times (-1), then the viridis table for indices 0..255
+        coloraxis=dict(
+            colorscale=TIME_COLORSCALE,
+            cmin=-1,
+            cmax=VIRIDIS_SIZE - 1,
+            showscale=False,
+        ),
         font=dict(
             family="Arial, sans-serif",
             size=16,         # Global base font size (increased)
@@ -1,7 +1,9 @@
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
+from utils.colors import VIRIDIS_COLORSCALE
+from utils.data import as_lift_frame
+from utils.heatmap import ampm_labels, concat, count_labels, hover_grid
 
 def create_time_vs_weight_2d(df: pd.DataFrame) -> go.Figure:
     """
@@ -10,20 +12,10 @@ def create_time_vs_weight_2d(df: pd.DataFrame) -> go.Figure:
     
     Assumes:
       - The DataFrame has a 'Time' column in military float (e.g., 1436.0).
-      - The DataFrame has been converted to decimal hours in a column named 'DecimalHour'.
       - A weight column (e.g., 'Top Set Weight' or 'Average Weight') is present.
+    The 'DecimalHour' column is taken from the shared lift frame (utils.data).
     """
-    def to_decimal_hours(mil_time_str):
-        # Remove any ':' just in case
-        mil_time_str = mil_time_str.replace(":", "")
-        try:
-            # Convert to float to handle "1436.0", then to int
-            t = int(float(mil_time_str))
-            hh = t // 100
-            mm = t % 100
-            return hh + mm / 60.0
-        except:
-            return np.nan
+    df = as_lift_frame(df)
 
     # 1) Determine which weight column to use (customize as needed)
     weight_col = "Top Set Weight"
@@ -32,11 +24,6 @@ def create_time_vs_weight_2d(df: pd.DataFrame) -> go.Figure:
         if weight_col not in df.columns:
             raise ValueError("No valid weight column found (e.g., 'Top Set Weight' or 'Average Weight').")
 
-    # Ensure "Time" is a string and convert to DecimalHour
-    df["Time"] = df["Time"].astype(str)
-    print(df["Time"])
-    df["DecimalHour"] = df["Time"].apply(to_decimal_hours)
-
     # 2) Drop rows with invalid time or weight data
     df = df.dropna(subset=["DecimalHour", weight_col])
 
@@ -64,36 +51,21 @@ def create_time_vs_weight_2d(df: pd.DataFrame) -> go.Figure:
     xcenters = 0.5 * (xedges[:-1] + xedges[1:])
     ycenters = 0.5 * (yedges[:-1] + yedges[1:])
 
-    # 6) Create a Plotly colorscale from a matplotlib colormap (viridis)
-    viridis = plt.cm.viridis.copy()
-    viridis.set_bad("white")  # Set NaN values to white
-    plotly_colorscale = [
-        [i / 255.0, f"rgb({r},{g},{b})"]
-        for i, (r, g, b, _) in enumerate((viridis(np.linspace(0, 1, 256)) * 255).astype(int))
-    ]
+    # 6) Plotly viridis colorscale (NaN bins are left unpainted)
+    plotly_colorscale = VIRIDIS_COLORSCALE
 
-    # 7) Format time bins in AM/PM format
-    def decimal_hour_to_ampm(decimal_hour):
-        hour = int(decimal_hour)
-        minute = int(round((decimal_hour - hour) * 60))
-        period = "AM" if hour < 12 else "PM"
-        hour = hour % 12
-        hour = 12 if hour == 0 else hour
-        return f"{hour}:{minute:02d} {period}"
-    
-    # Only display every third label for clarity
-    time_labels = [decimal_hour_to_ampm(x) if i % 3 == 0 else "" for i, x in enumerate(xcenters)]
+    # 7) Format time bins in AM/PM format, only every third label for clarity
+    time_labels = np.where(np.arange(len(xcenters)) % 3 == 0, ampm_labels(xcenters), "").tolist()
 
-    # 8) Create hover text for each bin as a 2D array
-    hover_text = np.full(H.shape, "", dtype=object)
-    for i in range(len(xcenters)):  # Iterate over time bins
-        for j in range(len(ycenters)):  # Iterate over weight bins
-            count = H[i, j]
-            if not np.isnan(count):
-                time_range = f"{decimal_hour_to_ampm(xedges[i])} - {decimal_hour_to_ampm(xedges[i + 1])}"
-                weight_range = f"{int(yedges[j])} - {int(yedges[j + 1])} lbs"
-                day_text = f"{int(count)} lift" if count == 1 else f"{int(count)} lifts"
-                hover_text[i, j] = f"{time_range}<br>{weight_range}<br>{day_text}"
+    # 8) Create hover text for each bin as a 2D array (time bins x weight bins)
+    time_range = concat(ampm_labels(xedges[:-1]), " - ", ampm_labels(xedges[1:]))
+    weight_range = concat(yedges[:-1].astype(int).astype(str), " - ", yedges[1:].astype(int).astype(str), " lbs")
+    hover_text = hover_grid(
+        time_range[:, None],
+        weight_range[None, :],
+        count_labels(H),
+        where=~np.isnan(H),
+    )
 
     # 9) Build the Heatmap
     fig = go.Figure(
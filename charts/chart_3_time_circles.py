@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from typing import Tuple
+from utils.data import as_lift_frame
 
 def create_am_pm_radial_time_plots(df: pd.DataFrame) -> Tuple[go.Figure, go.Figure]:
     """
@@ -22,51 +23,29 @@ def create_am_pm_radial_time_plots(df: pd.DataFrame) -> Tuple[go.Figure, go.Figu
         A tuple (am_fig, pm_fig) where each is a plotly.graph_objects.Figure.
     """
     # -------------------------------------------------------------------------
-    # 1) Convert 'Time' -> 'DecimalHour' if not already present.
+    # 1) 'DecimalHour' and 'QuarterBin' come from the shared lift frame.
     # -------------------------------------------------------------------------
-    def to_decimal_hours(mil_time_str: str) -> float:
-        """Convert a military time string (e.g., '1436.0') to decimal hours."""
-        try:
-            s = mil_time_str.replace(":", "")
-            val = int(float(s))  # e.g., '1436.0' -> 1436 (hh=14, mm=36)
-            hh = val // 100
-            mm = val % 100
-            return hh + mm / 60.0
-        except:
-            return np.nan
-
-    if "DecimalHour" not in df.columns:
-        df["Time"] = df["Time"].astype(str)
-        df["DecimalHour"] = df["Time"].apply(to_decimal_hours)
-
+    df = as_lift_frame(df)
     df = df.dropna(subset=["DecimalHour"])
 
     # -------------------------------------------------------------------------
     # 2) Split into AM (0 ≤ hr < 12) and PM (12 ≤ hr < 24)
     # -------------------------------------------------------------------------
-    df_am = df[(df["DecimalHour"] >= 0) & (df["DecimalHour"] < 12)].copy()
-    df_pm = df[(df["DecimalHour"] >= 12) & (df["DecimalHour"] < 24)].copy()
+    df_am = df[(df["DecimalHour"] >= 0) & (df["DecimalHour"] < 12)]
+    df_pm = df[(df["DecimalHour"] >= 12) & (df["DecimalHour"] < 24)]
 
     # -------------------------------------------------------------------------
-    # 3) Define quarter-hour bins (48 bins per 12 hours, each representing 15 minutes)
+    # 3) Quarter-hour bins (48 bins per 12 hours, each representing 15 minutes):
+    #    QuarterBin is 0..95 over the day, so PM bins are shifted down by 48
     # -------------------------------------------------------------------------
-    def quarter_hour_bin(decimal_hr: float) -> int:
-        """Convert a decimal hour in [0, 12) to an integer bin index [0, 47]."""
-        return int(decimal_hr * 4)
-
-    df_am["QBin"] = df_am["DecimalHour"].apply(quarter_hour_bin)
-
-    def pm_quarter_hour_bin(decimal_hr: float) -> int:
-        """For PM times (12 ≤ hr < 24), subtract 12 and convert to a quarter-hour bin [0, 47]."""
-        return int((decimal_hr - 12.0) * 4)
-
-    df_pm["QBin"] = df_pm["DecimalHour"].apply(pm_quarter_hour_bin)
+    am_qbins = df_am["QuarterBin"].astype(int)
+    pm_qbins = df_pm["QuarterBin"].astype(int) - 48
 
     # -------------------------------------------------------------------------
     # 4) Count lifts per quarter-hour bin for AM and PM
     # -------------------------------------------------------------------------
-    am_counts = df_am["QBin"].value_counts().sort_index()
-    pm_counts = df_pm["QBin"].value_counts().sort_index()
+    am_counts = am_qbins.value_counts().sort_index()
+    pm_counts = pm_qbins.value_counts().sort_index()
 
     # Ensure all bins [0, 47] are present by filling missing bins with 0
     for b in range(48):
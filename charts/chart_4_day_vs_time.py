@@ -1,9 +1,9 @@
-import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
+from utils.data import as_lift_frame
+from utils.render import scatter_class
 
-def create_day_vs_time_of_day(df: pd.DataFrame) -> go.Figure:
+def create_day_vs_time_of_day(df: pd.DataFrame, renderer: str = None) -> go.Figure:
 
     """
     Create a scatter plot of:
@@ -15,24 +15,11 @@ def create_day_vs_time_of_day(df: pd.DataFrame) -> go.Figure:
       - A "Date" column from which we calculate day-of-year.
       - A "Time" column in 'military time' float/string format (e.g., "1436.0").
       - A weight column named "Top Set Weight" or "Average Weight".
+    The 'DecimalHour' column is taken from the shared lift frame (utils.data).
+    Large scatters are drawn with WebGL (see utils.render; renderer overrides
+    PHDED_SCATTER_RENDERER).
     """
-
-    # --------- Helper function to parse 'Time' into decimal hours --------- #
-    def to_decimal_hours(mil_time_str):
-        """
-        Converts military time (e.g., "1436.0" or "1436") to decimal hours (0..24).
-        """
-        if not isinstance(mil_time_str, str):
-            mil_time_str = str(mil_time_str)
-        mil_time_str = mil_time_str.replace(":", "")  # just in case
-        
-        try:
-            t = int(float(mil_time_str))
-            hh = t // 100
-            mm = t % 100
-            return hh + mm / 60.0
-        except:
-            return np.nan
+    df = as_lift_frame(df)
 
     # --------- Ensure we have a valid weight column --------- #
     weight_col = "Top Set Weight" 
@@ -46,14 +33,6 @@ def create_day_vs_time_of_day(df: pd.DataFrame) -> go.Figure:
     # --------- Ensure we can compute a day number from "Date" --------- #
     if "Date" not in df.columns:
         raise ValueError("DataFrame must have a 'Date' column to derive the day number.")
-    
-    # Convert "Date" column to datetime, then compute the day of year
-    df["Date"] = pd.to_datetime(df["Date"])
-    #df["DayNumber"] = df["Date"].dt.dayofyear  # or any other day calculation you want
-
-    # --------- Convert 'Time' to decimal hours --------- #
-    df["Time"] = df["Time"].astype(str)
-    df["DecimalHour"] = df["Time"].apply(to_decimal_hours)
 
     # --------- Drop rows with invalid times or weights --------- #
     df = df.dropna(subset=["Day Number", "DecimalHour", weight_col])
@@ -82,7 +61,7 @@ def create_day_vs_time_of_day(df: pd.DataFrame) -> go.Figure:
 
     # --------- Create Plotly scatter figure --------- #
     fig = go.Figure(
-        data=go.Scatter(
+        data=scatter_class(len(df), renderer)(
             x=df["Day Number"],
             y=df["DecimalHour"],
             mode="markers",
@@ -4,12 +4,15 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.mixture import GaussianMixture
+from utils.data import as_lift_frame
+from utils.intervals import add_rest_time
+from utils.models import fit_gmm
 
-def create_rest_time_histogram(df: pd.DataFrame):
+def create_rest_time_histogram(df: pd.DataFrame, max_gap_days: int = 1):
     """
     1) Computes a new column 'Rest Time' in hours, representing the time between
-       consecutive lifts on consecutive days.
+       consecutive lifts on consecutive days (or, with max_gap_days > 1,
+       across gaps of up to that many days).
     2) Plots a histogram of 'Rest Time' over 0..48 hours, bin size = 1 hour.
     3) Fits a 2-component Gaussian Mixture Model to 'Rest Time', then overlays:
        - Two separate Gaussian curves (one for each component).
@@ -17,24 +20,14 @@ def create_rest_time_histogram(df: pd.DataFrame):
     4) Places the legend inside the chart, showing mixture parameters (means, stdevs, weights).
     """
 
-    # ----------- 1) Check columns & sort data ----------- #
+    # ----------- 1) Check columns ----------- #
+    df = as_lift_frame(df)
     required_cols = {"Day Number", "DecimalHour"}
     if not required_cols.issubset(df.columns):
         raise ValueError(f"DataFrame must contain {required_cols} columns.")
 
-    # Sort by day number, then time
-    df = df.sort_values(["Day Number", "DecimalHour"]).reset_index(drop=True)
-
-    # ----------- 2) Compute 'Rest Time' ----------- #
-    df["Rest Time"] = np.nan
-    for i in range(1, len(df)):
-        curr_day = df.loc[i, "Day Number"]
-        prev_day = df.loc[i - 1, "Day Number"]
-        curr_dec_hour = df.loc[i, "DecimalHour"]
-        prev_dec_hour = df.loc[i - 1, "DecimalHour"]
-
-        if curr_day == prev_day + 1:
-            df.loc[i, "Rest Time"] = 24 - prev_dec_hour + curr_dec_hour
+    # ----------- 2) Sort by day number, then time & compute 'Rest Time' ----------- #
+    df = add_rest_time(df, max_gap_days)
 
     # We only want rows that have a valid Rest Time
     hist_df = df.dropna(subset=["Rest Time"])
@@ -52,8 +45,7 @@ def create_rest_time_histogram(df: pd.DataFrame):
 
     # ----------- 4) Fit a 2-Component Gaussian Mixture ----------- #
     X = hist_df["Rest Time"].values.reshape(-1, 1)
-    gm = GaussianMixture(n_components=2, random_state=42)
-    gm.fit(X)
+    gm = fit_gmm(X, 2, key="rest_time", random_state=42)
 
     weights = gm.weights_
     means = gm.means_.flatten()
@@ -1,12 +1,13 @@
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
+from utils.colors import VIRIDIS_COLORSCALE
+from utils.data import as_lift_frame
+from utils.heatmap import ampm_labels, concat, count_labels, hover_grid
 
 def create_day_of_week_vs_time_am_pm(df: pd.DataFrame) -> go.Figure:
     """
@@ -18,24 +19,8 @@ def create_day_of_week_vs_time_am_pm(df: pd.DataFrame) -> go.Figure:
     # --------------------
     # 1) Prepare Data
     # --------------------
-    df["Date"] = pd.to_datetime(df["Date"], format="%Y%m%d", errors="coerce")
-    df["DayOfWeek"] = df["Date"].dt.weekday  # Monday=0 ... Sunday=6
-
-    # Parse "Time" into decimal hours
-    def to_decimal_hours(t_str):
-        if not isinstance(t_str, str):
-            t_str = str(t_str)
-        t_str = t_str.replace(":", "")
-        try:
-            val = int(float(t_str))
-            hh = val // 100
-            mm = val % 100
-            return hh + mm / 60.0
-        except:
-            return np.nan
-
-    df["Time"] = df["Time"].astype(str)
-    df["DecimalHour"] = df["Time"].apply(to_decimal_hours)
+    # DayOfWeek (Monday=0 ... Sunday=6) and DecimalHour come from the lift frame
+    df = as_lift_frame(df)
 
     # Keep only valid rows
     df = df.dropna(subset=["DayOfWeek", "DecimalHour"])
@@ -62,12 +47,7 @@ def create_day_of_week_vs_time_am_pm(df: pd.DataFrame) -> go.Figure:
     # --------------------
     # 4) Colormap
     # --------------------
-    viridis = plt.cm.viridis.copy()
-    viridis.set_bad("white")  # For NaNs
-    viridis_colors = [
-        [i / 255.0, f"rgb({r},{g},{b})"]
-        for i, (r, g, b, a) in enumerate((viridis(np.linspace(0, 1, 256)) * 255).astype(int))
-    ]
+    viridis_colors = VIRIDIS_COLORSCALE
 
     # --------------------
     # 5) Bin Centers & Labels
@@ -77,36 +57,16 @@ def create_day_of_week_vs_time_am_pm(df: pd.DataFrame) -> go.Figure:
 
     day_labels = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
-    # Helper to format decimal hours as HH:MM AM/PM
-    def decimal_hour_to_ampm(decimal_hour):
-        hour = int(decimal_hour)
-        minute = int(round((decimal_hour - hour) * 60))
-        period = "AM" if hour < 12 else "PM"
-        # If hour == 24, reset to 0
-        if hour == 24:
-            hour = 0
-            period = "AM"
-        hour_12 = hour % 12
-        hour_12 = 12 if hour_12 == 0 else hour_12
-        return f"{hour_12}:{minute:02d} {period}"
-
     # --------------------
-    # 6) Build Hover Text (2D)
-    # --------------------
-    hover_text = []
-    for j in range(len(ycenters)):      # y-axis index
-        row_text = []
-        # Time range for the j-th bin
-        time_start = decimal_hour_to_ampm(yedges[j])
-        time_end   = decimal_hour_to_ampm(yedges[j+1])
-        for i in range(len(xcenters)):  # x-axis index
-            # Day label from day index (e.g., 0.5 -> day=0 => Monday)
-            day_index = int(xcenters[i])
-            day_str = day_labels[day_index] if 0 <= day_index < len(day_labels) else "Unknown"
-            count = H[i, j]
-            count_str = "0 lifts" if np.isnan(count) else f"{int(count)} lifts"
-            row_text.append(f"{day_str}<br>{time_start} - {time_end}<br>{count_str}")
-        hover_text.append(row_text)
+    # 6) Build Hover Text (2D, rows = time bins, columns = days)
+    # --------------------
+    day_names = np.array(day_labels)[xcenters.astype(int)]
+    time_range = concat(ampm_labels(yedges[:-1]), " - ", ampm_labels(yedges[1:]))
+    hover_text = hover_grid(
+        day_names[None, :],
+        time_range[:, None],
+        count_labels(H.T, singular="lifts"),
+    )
 
     # --------------------
     # 7) Plotly Figure
@@ -127,7 +87,7 @@ def create_day_of_week_vs_time_am_pm(df: pd.DataFrame) -> go.Figure:
 
     # Only show y-axis ticks every 4 hours: 0, 4, 8, 12, 16, 20, 24
     tickvals_4h = np.arange(0, 25, 4)
-    ticktext_4h = [decimal_hour_to_ampm(t) for t in tickvals_4h]
+    ticktext_4h = ampm_labels(tickvals_4h).tolist()
 
     # --------------------
     # 8) Update Layout with Larger Fonts and Transparent Backgrounds
@@ -175,8 +135,7 @@ def create_day_of_week_vs_weight_with_labels(df: pd.DataFrame) -> go.Figure:
     # --------------------
     # 1) Prepare Data
     # --------------------
-    df["Date"] = pd.to_datetime(df["Date"], format="%Y%m%d", errors="coerce")
-    df["DayOfWeek"] = df["Date"].dt.weekday  # Monday=0..Sunday=6
+    df = as_lift_frame(df)  # DayOfWeek: Monday=0..Sunday=6
 
     # Keep only valid rows
     df = df.dropna(subset=["DayOfWeek", "Top Set Weight"])
@@ -200,12 +159,7 @@ def create_day_of_week_vs_weight_with_labels(df: pd.DataFrame) -> go.Figure:
     # --------------------
     # 4) Colormap
     # --------------------
-    viridis = plt.cm.viridis.copy()
-    viridis.set_bad("white")
-    viridis_colors = [
-        [i / 255.0, f"rgb({r},{g},{b})"]
-        for i, (r, g, b, a) in enumerate((viridis(np.linspace(0, 1, 256)) * 255).astype(int))
-    ]
+    viridis_colors = VIRIDIS_COLORSCALE
 
     # --------------------
     # 5) Bin Centers & Labels
@@ -216,20 +170,14 @@ def create_day_of_week_vs_weight_with_labels(df: pd.DataFrame) -> go.Figure:
     day_labels = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
     # --------------------
-    # 6) Build Hover Text (2D)
-    # --------------------
-    hover_text = []
-    for j in range(len(ycenters)):       # y index
-        row_text = []
-        w_start = int(yedges[j])
-        w_end   = int(yedges[j+1])
-        for i in range(len(xcenters)):   # x index
-            day_index = int(xcenters[i])
-            day_str = day_labels[day_index] if 0 <= day_index < len(day_labels) else "Unknown"
-            count = H[i, j]
-            count_str = "0 lifts" if np.isnan(count) else f"{int(count)} lifts"
-            row_text.append(f"{day_str}<br>Weight: {w_start} lbs<br>{count_str}")
-        hover_text.append(row_text)
+    # 6) Build Hover Text (2D, rows = weight bins, columns = days)
+    # --------------------
+    day_names = np.array(day_labels)[xcenters.astype(int)]
+    hover_text = hover_grid(
+        day_names[None, :],
+        concat("Weight: ", yedges[:-1, None].astype(int).astype(str), " lbs"),
+        count_labels(H.T, singular="lifts"),
+    )
 
     # --------------------
     # 7) Plotly Figure
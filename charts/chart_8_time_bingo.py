@@ -3,12 +3,14 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import scipy.stats as stats
-from sklearn.mixture import GaussianMixture
+from utils.data import as_lift_frame
+from utils.heatmap import concat, hover_grid, zero_pad
+from utils.models import bic_sweep
 
 def create_time_bingo(df: pd.DataFrame):
-    # Compute hour and minute values from the DecimalHour column.
-    df["Hour"] = df["DecimalHour"].astype(int)
-    df["Minute"] = ((df["DecimalHour"] - df["Hour"]) * 60).round().astype(int)
+    # Hour and Minute come from the shared lift frame; keep rows with a valid time.
+    df = as_lift_frame(df).dropna(subset=["DecimalHour"])
+    df = df.assign(Hour=df["Hour"].astype(int), Minute=df["Minute"].astype(int))
 
     # ------------------------------
     # Group by Hour and Minute to Count Occurrences
@@ -65,15 +67,8 @@ def create_time_bingo(df: pd.DataFrame):
     # --------------------------------
     # Use the raw Hour values (each occurrence) for the GMM.
     hour_data = df["Hour"].values.reshape(-1, 1)
-    bic_values = {}
-    gmm_models = {}
-    max_components = 5  # Test models with 1 to 5 components.
-    for n in range(1, max_components + 1):
-        gmm = GaussianMixture(n_components=n, random_state=0)
-        gmm.fit(hour_data)
-        bic = gmm.bic(hour_data)
-        bic_values[n] = bic
-        gmm_models[n] = gmm
+    max_components = 5  # Test models with 1 to 5 components, fitted concurrently.
+    bic_values, gmm_models = bic_sweep(hour_data, range(1, max_components + 1), key="hour_of_day")
 
     best_n = min(bic_values, key=bic_values.get)
     best_gmm = gmm_models[best_n]
@@ -99,16 +94,12 @@ def create_time_bingo(df: pd.DataFrame):
     # --------------------------------
     # Custom Hover Text for the Main Heatmap
     # --------------------------------
-    hover_text = []
-    for hour in heatmap_data.index:
-        row_text = []
-        for minute in heatmap_data.columns:
-            count = heatmap_data.loc[hour, minute]
-            if count == 0:
-                row_text.append("")
-            else:
-                row_text.append(f"Time: {hour:02d}:{minute:02d}<br>Lifts: {int(count)}")
-        hover_text.append(row_text)
+    counts = heatmap_data.to_numpy()
+    hover_text = hover_grid(
+        concat("Time: ", zero_pad(heatmap_data.index)[:, None], ":", zero_pad(heatmap_data.columns)[None, :]),
+        concat("Lifts: ", counts.astype(int).astype(str)),
+        where=counts != 0,
+    )
 
     # --------------------------------
     # Create the Figure with Marginals on Left and Bottom
@@ -1,10 +1,106 @@
+import functools
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from scipy import signal
 from plotly.subplots import make_subplots
+from utils.colors import VIRIDIS_COLORSCALE
+from utils.decimate import decimate_indices
 
-def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int = None) -> go.Figure:
+def top_set_trace_data(df: pd.DataFrame, max_points: int = None, x_range=None) -> dict:
+    """
+    x/y of the top subplot's Top Set Weight series: the days inside x_range
+    (default: all of them), decimated to at most max_points.
+    """
+    if not df["Day Number"].is_monotonic_increasing:
+        df = df.sort_values("Day Number", kind="stable")
+    days = df["Day Number"].to_numpy(dtype=float)
+    weights = df["Top Set Weight"].to_numpy(dtype=float)
+    idx = decimate_indices(days, weights, max_points, x_range)
+    return {"x": df["Day Number"].iloc[idx], "y": df["Top Set Weight"].iloc[idx]}
+
+# Day ranges whose spectrum is kept per data version
+SPECTRUM_CACHE_SIZE = 256
+NOT_ENOUGH_DATA = "Not enough data points in selected range"
+
+class FFTSpectra:
+    """
+    The daily Effective Weight series interpolated onto a regular grid once
+    per data version, and the FFT spectrum of any day range of it, memoized
+    by (start_day, end_day) so dragging the range slider back and forth
+    recomputes nothing.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if not df["Day Number"].is_monotonic_increasing:
+            df = df.sort_values("Day Number", kind="stable")
+        self.days = df["Day Number"].to_numpy(dtype=float)
+        weights = df["Effective Weight"].to_numpy(dtype=float)
+        # Interpolate weights for missing days over the whole history; any
+        # sub-range of this grid equals interpolating that range on its own
+        self.first_day = int(self.days.min()) if len(self.days) else 0
+        regular_days = np.arange(self.first_day, int(self.days.max()) + 1) if len(self.days) else np.array([])
+        self.interpolated = np.interp(regular_days, self.days, weights) if len(self.days) else regular_days
+        self.spectrum = functools.lru_cache(maxsize=SPECTRUM_CACHE_SIZE)(self._spectrum)
+
+    def _spectrum(self, start_day=None, end_day=None):
+        """
+        (periods, magnitudes, min_day, max_day) for the recorded days in
+        [start_day, end_day], or None when fewer than two days fall in it.
+        """
+        days = self.days
+        if start_day is not None and end_day is not None:
+            days = days[(days >= start_day) & (days <= end_day)]
+        if len(days) < 2:
+            return None
+
+        min_day = int(days.min())
+        max_day = int(days.max())
+        interpolated_weights = self.interpolated[min_day - self.first_day:max_day - self.first_day + 1]
+
+        # Detrend the data to remove the overall increasing/decreasing trend
+        detrended_weights = signal.detrend(interpolated_weights)
+
+        # Apply a Hanning window to reduce spectral leakage
+        window = signal.windows.hann(len(detrended_weights))
+        windowed_weights = detrended_weights * window
+
+        # Compute FFT
+        fft_result = np.fft.rfft(windowed_weights)
+        fft_freqs = np.fft.rfftfreq(len(interpolated_weights))
+
+        # Convert frequencies to periods (in days)
+        periods = 1 / fft_freqs[1:]  # Skip the DC component (frequency = 0)
+        magnitudes = np.abs(fft_result)[1:]  # Skip the DC component
+        return periods, magnitudes, min_day, max_day
+
+def fft_title(min_day: int = None, max_day: int = None) -> str:
+    """Figure title for a spectrum over min_day..max_day (None: not enough data)."""
+    if min_day is None:
+        return f"Lifting Pattern Analysis<br><sub>{NOT_ENOUGH_DATA}</sub>"
+    date_range_text = f"FFT Analysis Range: Day {min_day} to {max_day}"
+    return f"Lifting Pattern Analysis<br><sub>{date_range_text}</sub>"
+
+def fft_range_update(spectra: FFTSpectra, start_day: int, end_day: int) -> dict:
+    """
+    What changes in the figure when the analysed range moves: the shaded
+    rectangle's x, the spectrum trace's x/y and the title.
+    """
+    result = spectra.spectrum(start_day, end_day)
+    if result is None:
+        periods, magnitudes, title = [], [], fft_title()
+    else:
+        periods, magnitudes, min_day, max_day = result
+        title = fft_title(min_day, max_day)
+    return {
+        "shade_x": [start_day, start_day, end_day, end_day],
+        "periods": periods,
+        "magnitudes": magnitudes,
+        "title": title,
+    }
+
+def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int = None,
+                        max_points: int = None, spectra: FFTSpectra = None) -> go.Figure:
     """
     Creates a figure showing:
     1. Top subplot: Full time series of top set weight with shaded selected region
@@ -14,6 +110,13 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
         df: DataFrame containing the lifting data
         start_day: Starting day number for analysis (inclusive)
         end_day: Ending day number for analysis (inclusive)
+        max_points: Most points drawn for the full time series (default
+            utils.decimate.MAX_POINTS); the FFT itself always uses every day
+        spectra: FFTSpectra of df to take the spectrum from (built if omitted)
+
+    With a day range the traces are, in order: the time series, the shaded
+    range and the spectrum; fft_range_update() gives what a range change
+    replaces.
     """
     
     # Ensure needed columns
@@ -22,18 +125,18 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
         if col not in df.columns:
             raise ValueError(f"Missing required column: {col}")
 
-    # Store the full dataset
-    df_full = df.copy()
+    # Keep a reference to the full dataset (read only, no copy needed)
+    df_full = df
     
-    # Filter data by day range if specified
-    if start_day is not None and end_day is not None:
-        df = df[(df["Day Number"] >= start_day) & (df["Day Number"] <= end_day)].copy()
+    if spectra is None:
+        spectra = FFTSpectra(df)
+    spectrum = spectra.spectrum(start_day, end_day)
 
-    if len(df) < 2:
+    if spectrum is None:
         # Return an empty figure with a message if not enough data
         fig = go.Figure()
         fig.add_annotation(
-            text="Not enough data points in selected range",
+            text=NOT_ENOUGH_DATA,
             xref="paper", yref="paper",
             x=0.5, y=0.5,
             showarrow=False,
@@ -55,10 +158,11 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
     )
 
     # Add full time series of top set weight
+    top_set = top_set_trace_data(df_full, max_points)
     fig.add_trace(
         go.Scatter(
-            x=df_full["Day Number"],
-            y=df_full["Top Set Weight"],
+            x=top_set["x"],
+            y=top_set["y"],
             mode='lines+markers',
             name='Top Set Weight',
             line=dict(color='#3498db', width=2),
@@ -88,33 +192,8 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
             row=1, col=1
         )
 
-    # Get the day numbers and weights for FFT
-    days = df["Day Number"].values
-    weights = df["Effective Weight"].values
+    periods, magnitudes, min_day, max_day = spectrum
 
-    # Create a regular time series by interpolating missing days
-    max_day = int(days.max())
-    min_day = int(days.min())
-    regular_days = np.arange(min_day, max_day + 1)
-    
-    # Interpolate weights for missing days
-    interpolated_weights = np.interp(regular_days, days, weights)
-    
-    # Detrend the data to remove the overall increasing/decreasing trend
-    detrended_weights = signal.detrend(interpolated_weights)
-    
-    # Apply a Hanning window to reduce spectral leakage
-    window = signal.windows.hann(len(detrended_weights))
-    windowed_weights = detrended_weights * window
-    
-    # Compute FFT
-    fft_result = np.fft.rfft(windowed_weights)
-    fft_freqs = np.fft.rfftfreq(len(regular_days))
-    
-    # Convert frequencies to periods (in days)
-    periods = 1 / fft_freqs[1:]  # Skip the DC component (frequency = 0)
-    magnitudes = np.abs(fft_result)[1:]  # Skip the DC component
-    
     # Add the FFT magnitude trace
     fig.add_trace(
         go.Scatter(
@@ -148,14 +227,12 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
         )
     
     # Update layout
-    date_range_text = f"FFT Analysis Range: Day {min_day} to {max_day}"
-    
     fig.update_layout(
         template="plotly_dark",
         paper_bgcolor="rgba(0, 0, 0, 0)",
         plot_bgcolor="rgba(0, 0, 0, 0)",
         title=dict(
-            text=f"Lifting Pattern Analysis<br><sub>{date_range_text}</sub>",
+            text=fft_title(min_day, max_day),
             font=dict(size=24, color="#FFFFFF"),
             x=0.5,
             xanchor='center',
@@ -212,3 +289,127 @@ def create_fft_analysis(df: pd.DataFrame, start_day: int = None, end_day: int =
         annotation.update(font=dict(color="#FFFFFF", size=16))
     
     return fig
+
+# Sliding-window spectrogram defaults: half-year windows advanced weekly
+SPECTROGRAM_WINDOW_DAYS = 182
+SPECTROGRAM_STEP_DAYS = 7
+
+def create_fft_spectrogram(df: pd.DataFrame, window_days: int = SPECTROGRAM_WINDOW_DAYS,
+                           step_days: int = SPECTROGRAM_STEP_DAYS, spectra: FFTSpectra = None) -> go.Figure:
+    """
+    Creates a spectrogram of the daily effective weight: the same detrended,
+    Hann-windowed FFT as create_fft_analysis, computed for every
+    window_days-long window advanced step_days at a time, in a single
+    scipy.signal.stft pass over the interpolated series.
+
+    x is the day at the centre of each window, y the period in days (log
+    scale, from 2 days up to the window length) and colour the magnitude,
+    on the same scale as the FFT figure's spectrum.
+    """
+    if spectra is None:
+        spectra = FFTSpectra(df)
+    series = spectra.interpolated
+
+    if len(series) < window_days:
+        fig = go.Figure()
+        fig.add_annotation(
+            text=f"Need at least {window_days} days of data for the spectrogram",
+            xref="paper", yref="paper",
+            x=0.5, y=0.5,
+            showarrow=False,
+            font=dict(size=20, color="#FFFFFF")
+        )
+        fig.update_layout(
+            template="plotly_dark",
+            paper_bgcolor="rgba(0, 0, 0, 0)",
+            plot_bgcolor="rgba(0, 0, 0, 0)"
+        )
+        return fig
+
+    # All windows at once; "spectrum" scaling divides by the window sum, so
+    # multiplying it back gives the plain rFFT magnitudes create_fft_analysis shows
+    window = signal.windows.hann(window_days)
+    freqs, centers, Zxx = signal.stft(
+        series,
+        fs=1.0,
+        window=window,
+        nperseg=window_days,
+        noverlap=window_days - step_days,
+        detrend="linear",
+        boundary=None,
+        padded=False,
+        scaling="spectrum",
+    )
+    magnitudes = np.abs(Zxx[1:]) * window.sum()  # Skip the DC component
+    periods = 1 / freqs[1:]
+    days = spectra.first_day + centers
+
+    fig = go.Figure(
+        go.Heatmap(
+            x=days,
+            y=periods,
+            z=magnitudes,
+            colorscale=VIRIDIS_COLORSCALE,
+            colorbar=dict(
+                title="Magnitude",
+                title_font=dict(size=14, color="#FFFFFF"),
+                tickfont=dict(color="#FFFFFF")
+            ),
+            hovertemplate=(
+                "Window centre: Day %{x:.0f}<br>"
+                "Period: %{y:.1f} days<br>"
+                "Magnitude: %{z:.1f}<br>"
+                "<extra></extra>"
+            )
+        )
+    )
+
+    # Same notable periods as the FFT figure, where the window can resolve them
+    notable_periods = [7, 14, 30.44, 91.31, 182.62]  # days
+    notable_labels = ['Weekly', 'Biweekly', 'Monthly', 'Quarterly', 'Semi-annual']
+    for period, label in zip(notable_periods, notable_labels):
+        if period > periods.max():
+            continue
+        fig.add_hline(
+            y=period,
+            line_dash="dash",
+            line_color="rgba(255, 255, 255, 0.3)",
+            annotation_text=label,
+            annotation_position="right",
+            annotation=dict(font=dict(color="#FFFFFF"))
+        )
+
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor="rgba(0, 0, 0, 0)",
+        plot_bgcolor="rgba(0, 0, 0, 0)",
+        title=dict(
+            text=(
+                "Lifting Pattern Spectrogram<br>"
+                f"<sub>{window_days}-day windows every {step_days} days</sub>"
+            ),
+            font=dict(size=24, color="#FFFFFF"),
+            x=0.5,
+            xanchor='center'
+        ),
+        height=500,
+        margin=dict(l=60, r=100, t=120, b=60),
+        hoverlabel=dict(
+            bgcolor="rgba(0,0,0,0.8)",
+            font=dict(color="#FFFFFF")
+        )
+    )
+    fig.update_xaxes(
+        title_text="Day Number",
+        gridcolor="rgba(255, 255, 255, 0.1)",
+        tickfont=dict(color="#FFFFFF"),
+        title_font=dict(size=14, color="#FFFFFF")
+    )
+    fig.update_yaxes(
+        title_text="Period (days)",
+        type="log",
+        gridcolor="rgba(255, 255, 255, 0.1)",
+        tickfont=dict(color="#FFFFFF"),
+        title_font=dict(size=14, color="#FFFFFF")
+    )
+    return fig
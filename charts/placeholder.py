@@ -0,0 +1,23 @@
+import plotly.graph_objects as go
+
+def create_placeholder_figure(message: str) -> go.Figure:
+    """
+    Empty dark figure with a centered message, shown in place of a chart
+    that could not be built.
+    """
+    fig = go.Figure()
+    fig.add_annotation(
+        text=message,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5,
+        showarrow=False,
+        font=dict(size=20, color="#FFFFFF")
+    )
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor="rgba(0, 0, 0, 0)",
+        plot_bgcolor="rgba(0, 0, 0, 0)",
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False)
+    )
+    return fig
@@ -20,24 +20,24 @@ def create_boolean_grip_heatmap(df: pd.DataFrame) -> go.Figure:
             raise ValueError(f"Missing required column: {col}")
 
     # Convert boolean columns to strings for easier concatenation
-    df["Beltless"] = df["Beltless"].astype(str)
-    df["Stiff Bar"] = df["Stiff Bar"].astype(str)
-    df["Deficiet"] = df["Deficiet"].astype(str)
-    df["Pauses"] = df["Pauses"].astype(str)
+    beltless = df["Beltless"].astype(str)
+    stiff_bar = df["Stiff Bar"].astype(str)
+    deficiet = df["Deficiet"].astype(str)
+    pauses = df["Pauses"].astype(str)
 
-    # Create combinations for x-axis and y-axis
-    df["X_Combination"] = (
+    # Create combinations for x-axis and y-axis (kept out of df, which is shared)
+    x_combination = (
         df["Grip"] + 
-        "-Beltless-" + df["Beltless"] + 
-        "-StiffBar-" + df["Stiff Bar"]
-    )
-    df["Y_Combination"] = (
-        "Deficiet-" + df["Deficiet"] +
-        "-Pauses-" + df["Pauses"]
-    )
+        "-Beltless-" + beltless + 
+        "-StiffBar-" + stiff_bar
+    ).rename("X_Combination")
+    y_combination = (
+        "Deficiet-" + deficiet +
+        "-Pauses-" + pauses
+    ).rename("Y_Combination")
 
     # Count occurrences for each combination
-    heatmap_data = df.groupby(["X_Combination", "Y_Combination"]).size().reset_index(name="Count")
+    heatmap_data = df.groupby([x_combination, y_combination]).size().reset_index(name="Count")
 
     # Pivot data for heatmap
     pivot_table = heatmap_data.pivot(index="Y_Combination", columns="X_Combination", values="Count").fillna(0)
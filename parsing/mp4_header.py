@@ -0,0 +1,144 @@
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+
+# Reads the two facts time_parser needs from an MP4/MOV file (the movie's
+# creation time and each track's kind and size) straight from the box tree,
+# seeking past everything else. Only moov/mvhd, moov/trak/tkhd and
+# moov/trak/mdia/hdlr are read, a few hundred bytes however large the clip.
+
+# MP4 timestamps count seconds from 1904-01-01 UTC
+MP4_EPOCH_OFFSET = 2082844800  # seconds from 1904-01-01 to 1970-01-01
+
+# Boxes we descend into on the way to the ones we read
+CONTAINERS = {b"moov", b"trak", b"mdia"}
+
+HANDLER_CODEC_TYPES = {b"vide": "video", b"soun": "audio", b"subt": "subtitle", b"text": "subtitle"}
+
+
+class Mp4HeaderError(ValueError):
+    """The file is not an MP4 this reader understands; use ffprobe instead."""
+
+
+def _read_exact(f, n):
+    data = f.read(n)
+    if len(data) != n:
+        raise Mp4HeaderError("unexpected end of file")
+    return data
+
+
+def _boxes(f, start, end):
+    """(type, payload_start, box_end) for every box between start and end."""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", _read_exact(f, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", _read_exact(f, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset  # box runs to the end of its parent
+        if size < header or offset + size > end:
+            raise Mp4HeaderError(f"bad {box_type!r} box size {size} at offset {offset}")
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _full_box(f, payload_start, length):
+    """The version byte and body of a full box (skipping its 3 flag bytes)."""
+    f.seek(payload_start)
+    data = _read_exact(f, length)
+    return data[0], data[4:]
+
+
+def _creation_time(seconds):
+    """
+    An mvhd timestamp as ffprobe prints it, or None when unset. Like FFmpeg,
+    values too small to be since 1904 are taken as Unix time.
+    """
+    if not seconds:
+        return None
+    if seconds >= MP4_EPOCH_OFFSET:
+        seconds -= MP4_EPOCH_OFFSET
+    try:
+        dt = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+    except (OverflowError, ValueError) as exc:
+        # Garbage in a 64-bit mvhd; let ffprobe have a go at the file
+        raise Mp4HeaderError(f"creation time {seconds} out of range") from exc
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+
+def _mvhd(f, payload_start):
+    version, body = _full_box(f, payload_start, 12)
+    return struct.unpack(">Q" if version == 1 else ">I", body[:8 if version == 1 else 4])[0]
+
+
+def _tkhd(f, payload_start):
+    """Track width and height (16.16 fixed point in the box) as whole pixels."""
+    f.seek(payload_start)
+    version = _read_exact(f, 1)[0]
+    # version/flags, times, track id, reserved and duration, then reserved,
+    # layer, alternate group, volume, reserved and the 3x3 matrix
+    offset = (4 + 32 if version == 1 else 4 + 20) + 8 + 8 + 36
+    f.seek(payload_start + offset)
+    width, height = struct.unpack(">II", _read_exact(f, 8))
+    return width >> 16, height >> 16
+
+
+def _hdlr(f, payload_start):
+    _, body = _full_box(f, payload_start, 12)
+    return body[4:8]
+
+
+def _track(f, payload_start, box_end):
+    size = handler = None
+    for box_type, start, end in _boxes(f, payload_start, box_end):
+        if box_type == b"tkhd":
+            size = _tkhd(f, start)
+        elif box_type == b"mdia":
+            for child_type, child_start, _ in _boxes(f, start, end):
+                if child_type == b"hdlr":
+                    handler = _hdlr(f, child_start)
+    if size is None or handler is None:
+        raise Mp4HeaderError("track without tkhd or hdlr")
+    stream = {"codec_type": HANDLER_CODEC_TYPES.get(handler, "data")}
+    if handler == b"vide":
+        stream["width"], stream["height"] = size
+    return stream
+
+
+def read_mp4_header(filepath):
+    """
+    The subset of `ffprobe -show_format -show_streams` output that
+    time_parser uses, read from the MP4 header:
+
+        {"format": {"tags": {"creation_time": "2023-03-05T18:25:00.000000Z"}},
+         "streams": [{"codec_type": "video", "width": 3840, "height": 2160}, ...]}
+
+    creation_time is left out when the file does not set one, as ffprobe
+    does. Widths and heights are the track header's display size, which is
+    what ffprobe reports for everything but anamorphic video.
+
+    Raises Mp4HeaderError when the file is not a well-formed MP4.
+    """
+    with open(filepath, "rb") as f:
+        file_end = os.fstat(f.fileno()).st_size
+        moov = None
+        for box_type, start, end in _boxes(f, 0, file_end):
+            if box_type == b"moov":
+                moov = start, end
+                break
+        if moov is None:
+            raise Mp4HeaderError("no moov box")
+
+        creation = None
+        streams = []
+        for box_type, start, end in _boxes(f, *moov):
+            if box_type == b"mvhd":
+                creation = _creation_time(_mvhd(f, start))
+            elif box_type == b"trak":
+                streams.append(_track(f, start, end))
+
+    tags = {"creation_time": creation} if creation else {}
+    return {"format": {"tags": tags}, "streams": streams}
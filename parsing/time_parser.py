@@ -1,150 +1,431 @@
+import argparse
+import csv
+import fnmatch
 import os
 import subprocess
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 import pandas as pd
 
-# ------------------------------
-# 1. Process all mp4 files in a folder
-# ------------------------------
+from mp4_header import Mp4HeaderError, read_mp4_header
 
 # Specify the directory containing your mp4 files
 #directory = 'path/to/your/mp4_files'
 directory = '/mnt/d/PHDED/0_Unsorted_Videos/2023'
 
-# List to hold individual video records
-records = []
-
-for filename in os.listdir(directory):
-    if filename.lower().endswith('.mp4'):
-        filepath = os.path.join(directory, filename)
-        
-        # Use ffprobe to get metadata (both format and streams)
-        cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            filepath
-        ]
-        try:
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-            metadata = json.loads(result.stdout)
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
+# ffprobe processes run at once. Each one mostly waits on process startup
+# and disk reads, so a small pool keeps the disk busy without thrashing it.
+PROBE_WORKERS = int(os.environ.get("PHDED_PROBE_WORKERS", "8"))
+
+# ffprobe results of earlier runs, one JSON object per line. Recorded clips
+# never change, so a file whose size and mtime match its entry is not probed again.
+PROBE_CACHE = os.environ.get(
+    "PHDED_PROBE_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "probe_cache.jsonl")
+)
+
+
+# ------------------------------
+# 1. Find and probe the mp4 files under the given folders
+# ------------------------------
+def _matches(path, patterns):
+    """Whether the file/folder name or the full path matches any glob, ignoring case."""
+    name = os.path.basename(path).lower()
+    path = path.lower()
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(path, p) for p in patterns)
+
+
+def iter_videos(roots, include=("*.mp4",), exclude=(), recursive=True):
+    """
+    Yield the paths of the files under each root whose name or path matches an
+    include glob and none of the exclude globs (which also prune folders),
+    walking each folder with os.scandir in name order, one folder at a time.
+    """
+    include = [p.lower() for p in include]
+    exclude = [p.lower() for p in exclude]
+    for root in roots:
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            yield root
             continue
-        
-        # Attempt to get the creation time from metadata
-        creation_time_str = None
-        if "format" in metadata and "tags" in metadata["format"]:
-            creation_time_str = metadata["format"]["tags"].get("creation_time")
-        
-        # If not available, use the file's modification time
-        if creation_time_str is None:
-            mtime = os.path.getmtime(filepath)
-            creation_time_str = datetime.fromtimestamp(mtime).isoformat()
-        
-        # Parse the creation time string into a datetime object.
-        # Replace "Z" with "+00:00" to ensure proper parsing.
-        try:
-            dt = datetime.fromisoformat(creation_time_str.replace("Z", "+00:00"))
-        except Exception as e:
-            print(f"Error parsing date for {filename}: {e}")
+        yield from _scan(root, include, exclude, recursive)
+
+
+def _scan(folder, include, exclude, recursive):
+    try:
+        with os.scandir(folder) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        print(f"Error reading {folder}: {e}")
+        return
+    for entry in entries:
+        if _matches(entry.path, exclude):
             continue
-        
-        # ------------------------------
-        # 1. Adjust the time by subtracting 5 hours
-        # ------------------------------
-        dt = dt - timedelta(hours=5)
-        
-        # Format date as YYYYMMDD and time as HHMM (no colon)
-        date_str = dt.strftime("%Y%m%d")
-        time_str = dt.strftime("%H%M")
-        
-        # ------------------------------
-        # 2. Determine the video type
-        # ------------------------------
-        # If any video stream has a width or height of 3840, classify as "DJI"; otherwise, "Phone"
-        video_type = "Phone"  # default
-        if "streams" in metadata:
-            for stream in metadata["streams"]:
-                if stream.get("codec_type") == "video":
-                    width = stream.get("width")
-                    height = stream.get("height")
-                    if width == 3840 or height == 3840:
-                        video_type = "DJI"
-                        break
-        
-        # Save the record (one per video)
-        records.append({
-            "date": date_str,
-            "time": time_str,
-            "type": video_type
-        })
-
-# Convert the list of records to a DataFrame
-df = pd.DataFrame(records)
+        if entry.is_dir(follow_symlinks=False):
+            if recursive:
+                yield from _scan(entry.path, include, exclude, recursive)
+        elif entry.is_file() and _matches(entry.path, include):
+            yield entry.path
+
+
+def probe(filepath):
+    """
+    Format and stream metadata for one file, in ffprobe's JSON shape: read
+    from the MP4 header when possible, from ffprobe otherwise.
+    """
+    try:
+        return read_mp4_header(filepath)
+    except Mp4HeaderError:
+        return ffprobe(filepath)
+
+
+def ffprobe(filepath):
+    """ffprobe's format and stream metadata for one file (ffprobe is looked up on PATH)."""
+    cmd = [
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        filepath
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def _timed_probe(filepath):
+    start = time.perf_counter()
+    try:
+        return probe(filepath), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def iter_probes(filepaths, max_workers=None, cache=None, verbose=True):
+    """
+    Yield (filepath, metadata) for each file as its probe finishes, running
+    at most max_workers probes with as many more queued, so filepaths can be
+    a lazy iterator of any length. Files already in `cache` (a ProbeCache)
+    are yielded without probing and new results are added to it. Failures
+    are reported and skipped. With verbose, prints one progress line per
+    probed file with its probe time, then a summary.
+    """
+    max_workers = max_workers or PROBE_WORKERS
+    filepaths = iter(filepaths)
+    pending = {}
+    done = hits = failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            # Top the queue up to twice the pool size, answering cache hits straight away
+            while len(pending) < 2 * max_workers:
+                filepath = next(filepaths, None)
+                if filepath is None:
+                    break
+                cached = cache.get(filepath) if cache is not None else None
+                if cached is not None:
+                    done += 1
+                    hits += 1
+                    yield filepath, cached
+                    continue
+                pending[pool.submit(_timed_probe, filepath)] = filepath
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                filepath = pending.pop(future)
+                result, error, seconds = future.result()
+                filename = os.path.basename(filepath)
+                done += 1
+                if error is not None:
+                    failed += 1
+                    print(f"Error processing {filename}: {error}")
+                    continue
+                if cache is not None:
+                    cache.add(filepath, result)
+                if verbose:
+                    print(f"[{done}] {filename} {seconds:.2f}s")
+                yield filepath, result
+    if verbose:
+        print(f"{done} files: {done - hits - failed} probed, {hits} cached, {failed} failed "
+              f"in {time.perf_counter() - start:.2f}s with {max_workers} workers")
+
+
+class ProbeCache:
+    """
+    Append-only JSONL cache of ffprobe results, keyed by absolute path and
+    checked against the file's size and mtime. A changed file gets a new
+    line; the latest line for a path wins, and the file is compacted when
+    superseded lines outnumber live ones.
+    """
+
+    def __init__(self, cache_path=PROBE_CACHE):
+        self.cache_path = cache_path
+        self.entries = {}
+        stale = 0
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        path = entry["path"]
+                    except (ValueError, KeyError, TypeError):
+                        # e.g. the last line of a run that was interrupted mid-write
+                        stale += 1
+                        continue
+                    stale += path in self.entries
+                    self.entries[path] = entry
+        if stale > len(self.entries):
+            self._compact()
+
+    @staticmethod
+    def _stat(filepath):
+        st = os.stat(filepath)
+        return os.path.abspath(filepath), st.st_size, st.st_mtime_ns
+
+    def get(self, filepath):
+        """Cached metadata for filepath, or None if it is new, has changed since or is unreadable."""
+        try:
+            path, size, mtime_ns = self._stat(filepath)
+        except OSError:
+            return None
+        entry = self.entries.get(path)
+        if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+            return None
+        return entry["metadata"]
+
+    def add(self, filepath, metadata):
+        """Record metadata for filepath, appending it to the cache file straight away."""
+        path, size, mtime_ns = self._stat(filepath)
+        entry = {"path": path, "size": size, "mtime_ns": mtime_ns, "metadata": metadata}
+        self.entries[path] = entry
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        with open(self.cache_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def _compact(self):
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.cache_path)
+
+
+def video_record(filepath, metadata):
+    """The {date, time, type} record for one probed video, or None if its date cannot be parsed."""
+    filename = os.path.basename(filepath)
+
+    # Attempt to get the creation time from metadata
+    creation_time_str = None
+    if "format" in metadata and "tags" in metadata["format"]:
+        creation_time_str = metadata["format"]["tags"].get("creation_time")
+
+    # If not available, use the file's modification time
+    if creation_time_str is None:
+        mtime = os.path.getmtime(filepath)
+        creation_time_str = datetime.fromtimestamp(mtime).isoformat()
+
+    # Parse the creation time string into a datetime object.
+    # Replace "Z" with "+00:00" to ensure proper parsing.
+    try:
+        dt = datetime.fromisoformat(creation_time_str.replace("Z", "+00:00"))
+    except Exception as e:
+        print(f"Error parsing date for {filename}: {e}")
+        return None
+
+    # ------------------------------
+    # 1. Adjust the time by subtracting 5 hours
+    # ------------------------------
+    dt = dt - timedelta(hours=5)
+
+    # Format date as YYYYMMDD and time as HHMM (no colon)
+    date_str = dt.strftime("%Y%m%d")
+    time_str = dt.strftime("%H%M")
+
+    # ------------------------------
+    # 2. Determine the video type
+    # ------------------------------
+    # If any video stream has a width or height of 3840, classify as "DJI"; otherwise, "Phone"
+    video_type = "Phone"  # default
+    if "streams" in metadata:
+        for stream in metadata["streams"]:
+            if stream.get("codec_type") == "video":
+                width = stream.get("width")
+                height = stream.get("height")
+                if width == 3840 or height == 3840:
+                    video_type = "DJI"
+                    break
+
+    # One record per video
+    return {
+        "date": date_str,
+        "time": time_str,
+        "type": video_type
+    }
+
+
+# Per-video records, appended as each file is probed so that an interrupted
+# run picks up where it stopped
+RECORD_FIELDS = ["path", "date", "time", "type"]
+
+
+def done_paths(records_path):
+    """
+    Paths already in the records file. A partial last line, left by a run
+    that was killed mid-write, is cut off first.
+    """
+    if not os.path.exists(records_path):
+        return set()
+    with open(records_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with open(records_path, newline="", encoding="utf-8") as f:
+        return {row["path"] for row in csv.DictReader(f)}
+
+
+def write_records(probes, records_path):
+    """Append a record for every (filepath, metadata) in probes; returns how many were written."""
+    new_file = not os.path.exists(records_path) or os.path.getsize(records_path) == 0
+    written = 0
+    with open(records_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS, lineterminator="\n")
+        if new_file:
+            writer.writeheader()
+        for filepath, metadata in probes:
+            record = video_record(filepath, metadata)
+            if record is None:
+                continue
+            writer.writerow({"path": filepath, **record})
+            f.flush()
+            written += 1
+    return written
+
+
+def read_records(records_path, paths=None):
+    """
+    The date, time and type columns of the records file, as strings; with
+    `paths`, only the records of those files.
+    """
+    df = pd.read_csv(records_path, usecols=RECORD_FIELDS, dtype=str, keep_default_na=False)
+    if paths is not None:
+        df = df[df["path"].isin(paths)].reset_index(drop=True)
+    return df[["date", "time", "type"]]
+
 
 # ------------------------------
-# 2. Aggregate by date so that each date appears only once.
-#    If there is only one video on a date, use its time and type.
-#    If there are multiple videos on the same date, set time to empty.
+# 2. Aggregate by date so that each date appears only once, with an empty
+#    row for every date between the first and last that has no video.
 # ------------------------------
-aggregated = []
-for date, group in df.groupby("date"):
-    if len(group) == 1:
-        rec_time = group.iloc[0]["time"]
-        rec_type = group.iloc[0]["type"]
+# How to resolve a date with several videos:
+#   blank     leave time empty, keep type only if all the videos share it
+#   earliest  use the time and type of the earliest video that day
+#   latest    use the time and type of the latest video that day
+DUPLICATE_POLICIES = ("blank", "earliest", "latest")
+
+
+def aggregate_by_date(df, policy="blank"):
+    """
+    One row per date, from the first recorded date to the last, out of the
+    per-video records (date as YYYYMMDD, time as HHMM and type, all strings).
+    A date with a single video takes its time and type; dates with several
+    are resolved by `policy` (see DUPLICATE_POLICIES); dates without any are
+    left empty.
+    """
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {policy!r}, expected one of {DUPLICATE_POLICIES}")
+    if df.empty:
+        return pd.DataFrame(columns=["date", "time", "type"])
+
+    if policy == "blank":
+        per_date = df.groupby("date").agg(
+            videos=("time", "size"),
+            time=("time", "first"),
+            type=("type", "first"),
+            types=("type", "nunique"),
+        )
+        per_date["time"] = per_date["time"].where(per_date["videos"] == 1, "")
+        per_date["type"] = per_date["type"].where(per_date["types"] == 1, "")
     else:
-        # For duplicate dates, leave time blank.
-        rec_time = ""
-        # Optionally: if all videos for that date share the same type, you might keep it.
-        types = group["type"].unique()
-        rec_type = types[0] if len(types) == 1 else ""
-    aggregated.append({
-        "date": date,
-        "time": rec_time,
-        "type": rec_type
-    })
-
-agg_df = pd.DataFrame(aggregated)
+        # HHMM strings sort chronologically within a date
+        per_date = (
+            df.sort_values(["date", "time"], kind="stable")
+            .drop_duplicates("date", keep="first" if policy == "earliest" else "last")
+            .set_index("date")
+        )
 
-# ------------------------------
-# 3. Insert missing dates between the min and max dates
-# ------------------------------
-if not agg_df.empty:
-    # Convert the 'date' column to datetime objects for comparison
-    agg_df["date_dt"] = pd.to_datetime(agg_df["date"], format="%Y%m%d")
-    min_date = agg_df["date_dt"].min()
-    max_date = agg_df["date_dt"].max()
-    
-    # Create a complete date range from min_date to max_date
-    all_dates = pd.date_range(min_date, max_date, freq='D')
-    all_dates_str = all_dates.strftime("%Y%m%d")
-    
-    # Create a DataFrame for all dates with empty time and type values
-    all_dates_df = pd.DataFrame({"date": all_dates_str})
-    all_dates_df["time"] = ""
-    all_dates_df["type"] = ""
-    
-    # Merge the aggregated video data with the complete date list.
-    # If a date from all_dates_df is missing in agg_df, its time and type remain empty.
-    final_df = pd.merge(all_dates_df, agg_df.drop(columns=["date_dt"]), on="date", how="left", suffixes=("", "_agg"))
-    
-    # For dates present in agg_df, use its time and type; otherwise, keep the empty strings.
-    final_df["time"] = final_df["time_agg"].combine_first(final_df["time"])
-    final_df["type"] = final_df["type_agg"].combine_first(final_df["type"])
-    final_df.drop(columns=["time_agg", "type_agg"], inplace=True)
-    
-    # Ensure the final DataFrame is sorted by date
-    final_df = final_df.sort_values("date").reset_index(drop=True)
-else:
-    final_df = agg_df
+    dates = pd.to_datetime(per_date.index, format="%Y%m%d")
+    all_dates = pd.date_range(dates.min(), dates.max(), freq="D").strftime("%Y%m%d")
+    return (
+        per_date[["time", "type"]]
+        .reindex(all_dates, fill_value="")
+        .rename_axis("date")
+        .reset_index()
+    )
 
-# ------------------------------
-# Save the final DataFrame as a CSV
-# ------------------------------
-output_csv = "output.csv"
-final_df.to_csv(output_csv, index=False)
-print(f"CSV saved to {output_csv}")
\ No newline at end of file
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Extract the date, time and camera type of lift videos into a per-day CSV."
+    )
+    parser.add_argument("roots", nargs="*", default=[directory],
+                        help=f"folders (or files) to scan (default: {directory})")
+    parser.add_argument("-o", "--output", default="output.csv", help="per-day CSV to write (default: output.csv)")
+    parser.add_argument("--records", default=None,
+                        help="per-video records file, appended to as files are probed; only the "
+                             "records of files found under ROOTS go into the output "
+                             "(default: OUTPUT with .records.csv)")
+    parser.add_argument("--include", action="append", default=None, metavar="GLOB",
+                        help="file name or path glob to scan, repeatable, case-insensitive (default: *.mp4)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="file or folder name/path glob to skip, repeatable")
+    parser.add_argument("--no-recursive", dest="recursive", action="store_false",
+                        help="only scan the top level of each root")
+    parser.add_argument("--duplicates", choices=DUPLICATE_POLICIES, default="blank",
+                        help="how to fill in a date with several videos: blank the time (default), "
+                             "or keep the earliest or latest video")
+    parser.add_argument("--fresh", action="store_true",
+                        help="start a new records file instead of resuming the existing one")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"concurrent probes (default: {PROBE_WORKERS})")
+    parser.add_argument("--cache", default=PROBE_CACHE, help=f"probe cache file (default: {PROBE_CACHE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records_path = args.records or os.path.splitext(args.output)[0] + ".records.csv"
+    if args.fresh and os.path.exists(records_path):
+        os.remove(records_path)
+
+    # Files recorded by an earlier (possibly interrupted) run are not looked at again
+    done = done_paths(records_path)
+    if done:
+        print(f"Resuming: {len(done)} files already in {records_path}")
+    scanned = set()
+
+    def new_videos():
+        for filepath in iter_videos(args.roots, args.include or ["*.mp4"], args.exclude, args.recursive):
+            scanned.add(filepath)
+            if filepath not in done:
+                yield filepath
+
+    probes = iter_probes(new_videos(), max_workers=args.workers, cache=ProbeCache(args.cache))
+    written = write_records(probes, records_path)
+    print(f"Recorded {written} new files in {records_path}")
+
+    # Only the videos found by this scan count: records of other roots, of
+    # files since deleted or moved, or now excluded stay out of the output
+    final_df = aggregate_by_date(read_records(records_path, paths=scanned), policy=args.duplicates)
+
+    # ------------------------------
+    # Save the final DataFrame as a CSV
+    # ------------------------------
+    final_df.to_csv(args.output, index=False)
+    print(f"CSV saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+# utils is imported as a top-level package, as app.py does from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils import data  # noqa: E402
+
+HEADER = "Day Number,Date,Top Set Weight\n"
+
+
+def sheet(*rows):
+    return HEADER + "".join(f"{day},{date},{weight}\n" for day, date, weight in rows)
+
+
+# Days 1-3 entered, days 4-5 laid out for the future but still blank
+FIRST = sheet((1, 20211229, 225), (2, 20211230, 230), (3, 20211231, 235),
+              (4, 20220101, ""), (5, 20220102, ""))
+
+
+class SheetServer:
+    """Serves one CSV body with an ETag, answering a matching If-None-Match with 304."""
+
+    def __init__(self, body):
+        self.body = body
+        self.version = 0
+        self.requests = []  # (If-None-Match sent, status returned)
+
+    def publish(self, body):
+        self.body = body
+        self.version += 1
+
+    @property
+    def etag(self):
+        return f'"v{self.version}"'
+
+
+@pytest.fixture
+def server():
+    state = SheetServer(FIRST)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            validator = self.headers.get("If-None-Match")
+            if validator == state.etag:
+                state.requests.append((validator, 304))
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = state.body.encode()
+            state.requests.append((validator, 200))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", state.etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{httpd.server_address[1]}/export.csv"
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def local_csv(tmp_path):
+    return str(tmp_path / "local_data.csv")
+
+
+def read(path):
+    with open(path, newline="") as f:
+        return f.read()
+
+
+def test_first_refresh_downloads_the_sheet(server, local_csv):
+    assert data.refresh_data(server.url, local_csv) == 5
+    assert read(local_csv) == FIRST
+    assert data._read_meta(local_csv) == {"etag": '"v0"', "last_modified": None, "last_day_number": 3}
+
+
+def test_unchanged_sheet_costs_a_304(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    os.utime(local_csv, (0, 0))
+
+    assert data.refresh_data(server.url, local_csv) == 0
+    assert server.requests == [(None, 200), ('"v0"', 304)]
+    assert read(local_csv) == FIRST
+    assert not data.is_data_stale(local_csv)
+
+
+def test_appended_days_are_merged_after_the_watermark(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    # Day 4 gets filled in and day 6 laid out; day 2 is edited upstream,
+    # but it is at or before the watermark, so the local copy is kept
+    server.publish(sheet((1, 20211229, 225), (2, 20211230, 999), (3, 20211231, 235),
+                         (4, 20220101, 240), (5, 20220102, ""), (6, 20220103, "")))
+
+    assert data.refresh_data(server.url, local_csv) == 2
+    assert read(local_csv) == sheet((1, 20211229, 225), (2, 20211230, 230), (3, 20211231, 235),
+                                    (4, 20220101, 240), (5, 20220102, ""), (6, 20220103, ""))
+    assert data._read_meta(local_csv)["last_day_number"] == 4
+
+
+def test_shrunk_sheet_drops_rows_after_the_watermark(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    server.publish(sheet((1, 20211229, 225), (2, 20211230, 230), (3, 20211231, 235)))
+
+    assert data.refresh_data(server.url, local_csv) == 2
+    assert read(local_csv) == server.body
+
+
+def test_full_refresh_rewrites_every_row(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    server.publish(sheet((1, 20211229, 999), (2, 20211230, 230)))
+
+    assert data.refresh_data(server.url, local_csv, full=True) == 2
+    assert read(local_csv) == server.body
+    # full=True ignores the stored validators
+    assert server.requests[-1] == (None, 200)
+
+
+def test_changed_header_rewrites_the_file(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    server.publish("Day Number,Date,Top Set Weight,Notes\n1,20211229,225,pr\n")
+
+    assert data.refresh_data(server.url, local_csv) == 1
+    assert read(local_csv) == server.body
+
+
+def test_failed_refresh_keeps_the_local_copy(server, local_csv):
+    data.refresh_data(server.url, local_csv)
+    os.utime(local_csv, (0, 0))
+    with socket.socket() as sock:  # a port nothing is listening on
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    data.ensure_fresh(f"http://127.0.0.1:{port}/export.csv", local_csv)
+    assert read(local_csv) == FIRST
+
+
+def test_merge_new_rows_keeps_rows_up_to_the_watermark():
+    header = ["Day Number", "Top Set Weight"]
+    local = [["1", "225"], ["2", "230"], ["3", ""]]
+    remote = [["1", "999"], ["2", "999"], ["3", "235"], ["4", ""]]
+    rows, taken = data.merge_new_rows(header, local, remote, watermark=2)
+    assert rows == [["1", "225"], ["2", "230"], ["3", "235"], ["4", ""]]
+    assert taken == 2
+
+
+@pytest.fixture
+def fresh_csv(local_csv):
+    with open(local_csv, "w") as f:
+        f.write(FIRST)
+    return local_csv
+
+
+def test_failed_cache_write_is_not_fatal(fresh_csv, tmp_path, monkeypatch):
+    def partial_write(df, path, *args, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"half a frame")
+        raise TypeError("cannot serialize")
+
+    monkeypatch.setattr(data, "_CACHE_FORMAT", "pkl")
+    monkeypatch.setattr(data.pd.DataFrame, "to_pickle", partial_write)
+    cache_dir = tmp_path / "cache"
+
+    df = data.load_clean_data("http://unused.invalid/", fresh_csv, str(cache_dir))
+    assert list(df["Day Number"]) == [1, 2, 3]
+    assert os.listdir(cache_dir) == []
+
+
+def test_mixed_type_column_skips_the_feather_cache(fresh_csv, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    clean_data = data.clean_data
+
+    def mixed(df):
+        df = clean_data(df)
+        df["Notes"] = pd.Series([1, "pr", 2.5], index=df.index, dtype=object)
+        return df
+
+    monkeypatch.setattr(data, "clean_data", mixed)
+    cache_dir = tmp_path / "cache"
+
+    df = data.load_clean_data("http://unused.invalid/", fresh_csv, str(cache_dir))
+    assert list(df["Notes"]) == [1, "pr", 2.5]
+    assert os.listdir(cache_dir) == []
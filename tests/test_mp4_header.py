@@ -0,0 +1,131 @@
+import os
+import struct
+import sys
+import time
+
+import pytest
+
+# mp4_header sits next to time_parser, which imports it as a top-level module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "parsing"))
+from mp4_header import MP4_EPOCH_OFFSET, Mp4HeaderError, read_mp4_header  # noqa: E402
+
+MDAT_BYTES = 3 * 1024 ** 3  # sparse, so it costs no disk space; fits a 32-bit box size
+CREATED = MP4_EPOCH_OFFSET + 1678040700  # 2023-03-05T18:25:00Z
+
+
+# Synthetic clips: a small moov around a multi-GB sparse mdat, in the
+# layouts cameras and phones write (moov last or first, 32/64-bit box
+# sizes, version 0/1 headers). benchmarks/bench_mp4_header.py uses them too.
+def box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def full_box(box_type, version, payload):
+    return box(box_type, struct.pack(">B3x", version) + payload)
+
+
+def mvhd(created, version=0):
+    if version == 1:
+        times = struct.pack(">QQIQ", created, created, 1000, 0)
+    else:
+        times = struct.pack(">IIII", created, created, 1000, 0)
+    return full_box(b"mvhd", version, times + bytes(80))
+
+
+def trak(handler, width=0, height=0, version=0):
+    if version == 1:
+        head = struct.pack(">QQI4xQ", 0, 0, 1, 0)
+    else:
+        head = struct.pack(">III4xI", 0, 0, 1, 0)
+    tkhd = full_box(b"tkhd", version, head + bytes(8 + 8 + 36) + struct.pack(">II", width << 16, height << 16))
+    hdlr = full_box(b"hdlr", 0, bytes(4) + handler + bytes(12) + b"\0")
+    return box(b"trak", tkhd + box(b"mdia", hdlr))
+
+
+def write_clip(path, created, width, height, moov_first=False, version=0, large_mdat=False, moov=None):
+    """A header-only MP4 whose mdat is a hole of MDAT_BYTES."""
+    if moov is None:
+        moov = box(b"moov", mvhd(created, version)
+                   + trak(b"vide", width, height, version) + trak(b"soun", version=version))
+    ftyp = box(b"ftyp", b"isom" + bytes(4) + b"isommp42")
+    if large_mdat:
+        mdat_header = struct.pack(">I4sQ", 1, b"mdat", 16 + MDAT_BYTES)
+    else:
+        mdat_header = struct.pack(">I4s", 8 + MDAT_BYTES, b"mdat")
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        if moov_first:
+            f.write(moov)
+        f.write(mdat_header)
+        f.seek(MDAT_BYTES, os.SEEK_CUR)
+        if not moov_first:
+            f.write(moov)
+        f.truncate()
+
+
+def expected(created, width, height):
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime(created - MP4_EPOCH_OFFSET))
+    return {
+        "format": {"tags": {"creation_time": stamp}},
+        "streams": [{"codec_type": "video", "width": width, "height": height}, {"codec_type": "audio"}],
+    }
+
+
+@pytest.mark.parametrize("moov_first", [False, True], ids=["moov-last", "moov-first"])
+@pytest.mark.parametrize("version", [0, 1], ids=["v0", "v1"])
+@pytest.mark.parametrize("large_mdat", [False, True], ids=["mdat32", "mdat64"])
+def test_reads_creation_time_and_tracks(tmp_path, moov_first, version, large_mdat):
+    path = tmp_path / "clip.mp4"
+    write_clip(path, CREATED, 3840, 2160, moov_first=moov_first, version=version, large_mdat=large_mdat)
+    assert read_mp4_header(path) == expected(CREATED, 3840, 2160)
+
+
+def test_unset_creation_time_is_left_out(tmp_path):
+    path = tmp_path / "clip.mp4"
+    write_clip(path, 0, 1080, 1920)
+    assert read_mp4_header(path)["format"] == {"tags": {}}
+
+
+def test_unix_creation_time_is_read_as_unix(tmp_path):
+    # Some writers store seconds since 1970; FFmpeg takes small values as such
+    path = tmp_path / "clip.mp4"
+    write_clip(path, 1678040700, 1080, 1920)
+    assert read_mp4_header(path)["format"]["tags"]["creation_time"] == "2023-03-05T18:25:00.000000Z"
+
+
+def test_out_of_range_creation_time(tmp_path):
+    path = tmp_path / "clip.mp4"
+    write_clip(path, 2 ** 63, 3840, 2160, version=1)
+    with pytest.raises(Mp4HeaderError, match="out of range"):
+        read_mp4_header(path)
+
+
+def test_truncated_file(tmp_path):
+    path = tmp_path / "clip.mp4"
+    write_clip(path, CREATED, 3840, 2160)
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 20)  # cut into the moov at the end
+    with pytest.raises(Mp4HeaderError):
+        read_mp4_header(path)
+
+
+def test_missing_moov(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(box(b"ftyp", b"isom") + struct.pack(">I4s", 4096, b"mdat") + bytes(4088))
+    with pytest.raises(Mp4HeaderError, match="no moov box"):
+        read_mp4_header(path)
+
+
+def test_track_without_handler(tmp_path):
+    path = tmp_path / "clip.mp4"
+    tkhd = full_box(b"tkhd", 0, bytes(20 + 8 + 8 + 36) + struct.pack(">II", 3840 << 16, 2160 << 16))
+    write_clip(path, CREATED, 3840, 2160, moov=box(b"moov", mvhd(CREATED) + box(b"trak", tkhd)))
+    with pytest.raises(Mp4HeaderError, match="without tkhd or hdlr"):
+        read_mp4_header(path)
+
+
+def test_not_an_mp4(tmp_path):
+    path = tmp_path / "notes.mp4"
+    path.write_text('{"format": {}}\n')
+    with pytest.raises(Mp4HeaderError):
+        read_mp4_header(path)
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.registry import FigureRegistry  # noqa: E402
+
+
+def make_registry(frame, calls, previous=None, fail=()):
+    """A loader, a chart built on it (with a placeholder) and a chart built on that."""
+    def chart(df):
+        calls.append("chart")
+        if "chart" in fail:
+            raise RuntimeError("fit did not converge")
+        return f"chart of {len(df)} rows"
+
+    def summary(value):
+        calls.append("summary")
+        return f"summary of {value}"
+
+    registry = FigureRegistry(previous)
+    registry.register("data", lambda: frame)
+    registry.register("chart", chart, ["data"], fallback=lambda exc: "placeholder")
+    registry.register("summary", summary, ["chart"])
+    return registry
+
+
+def test_unchanged_inputs_are_reused():
+    frame = pd.DataFrame({"x": [1, 2, 3]})
+    calls = []
+    old = make_registry(frame, calls)
+    old.get("summary")
+
+    new = make_registry(frame.copy(), calls, previous=old)
+    assert new.get("summary") == "summary of chart of 3 rows"
+    assert calls == ["chart", "summary"]
+
+
+def test_changed_inputs_are_rebuilt():
+    calls = []
+    old = make_registry(pd.DataFrame({"x": [1, 2, 3]}), calls)
+    old.get("summary")
+
+    new = make_registry(pd.DataFrame({"x": [1, 2, 3, 4]}), calls, previous=old)
+    assert new.get("summary") == "summary of chart of 4 rows"
+    assert calls == ["chart", "summary"] * 2
+
+
+def test_fallback_values_are_not_reused():
+    frame = pd.DataFrame({"x": [1, 2, 3]})
+    calls = []
+    old = make_registry(frame, calls, fail={"chart"})
+    assert old.get("summary") == "summary of placeholder"
+    assert old.fell_back("chart") and old.fell_back("summary")
+
+    # Same data, and this time the fit succeeds
+    new = make_registry(frame, calls, previous=old)
+    assert new.get("chart") == "chart of 3 rows"
+    assert new.get("summary") == "summary of chart of 3 rows"
+    assert not new.fell_back("summary")
+
+
+def test_previous_registry_is_not_built_on():
+    frame = pd.DataFrame({"x": [1, 2, 3]})
+    calls = []
+    # The data is unreachable at cold start, so chart falls back without it
+    def unreachable():
+        raise OSError("sheet unreachable")
+
+    old = make_registry(frame, calls)
+    old.register("data", unreachable)
+    assert old.get("summary") == "summary of placeholder"
+
+    assert old.signature("summary", build=False) is None
+    new = make_registry(frame, calls, previous=old)
+    assert new.get("summary") == "summary of chart of 3 rows"
+    assert not old.is_built("data")
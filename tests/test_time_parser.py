@@ -0,0 +1,273 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# time_parser is a script run from parsing/ (it imports mp4_header as a
+# top-level module), so load it by path with that folder importable
+PARSING_DIR = os.path.join(os.path.dirname(__file__), "..", "parsing")
+sys.path.insert(0, PARSING_DIR)
+_spec = importlib.util.spec_from_file_location("time_parser", os.path.join(PARSING_DIR, "time_parser.py"))
+time_parser = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(time_parser)
+
+from test_mp4_header import CREATED, MP4_EPOCH_OFFSET, expected, write_clip  # noqa: E402
+
+
+def legacy_aggregate(df):
+    """The per-group loop plus fill_missing_dates that aggregate_by_date replaced."""
+    aggregated = []
+    for date, group in df.groupby("date"):
+        if len(group) == 1:
+            rec_time = group.iloc[0]["time"]
+            rec_type = group.iloc[0]["type"]
+        else:
+            rec_time = ""
+            types = group["type"].unique()
+            rec_type = types[0] if len(types) == 1 else ""
+        aggregated.append({"date": date, "time": rec_time, "type": rec_type})
+    agg_df = pd.DataFrame(aggregated)
+
+    agg_df["date_dt"] = pd.to_datetime(agg_df["date"], format="%Y%m%d")
+    all_dates = pd.date_range(agg_df["date_dt"].min(), agg_df["date_dt"].max(), freq="D")
+    all_dates_df = pd.DataFrame({"date": all_dates.strftime("%Y%m%d")})
+    all_dates_df["time"] = ""
+    all_dates_df["type"] = ""
+    final_df = pd.merge(all_dates_df, agg_df.drop(columns=["date_dt"]), on="date", how="left", suffixes=("", "_agg"))
+    final_df["time"] = final_df["time_agg"].combine_first(final_df["time"])
+    final_df["type"] = final_df["type_agg"].combine_first(final_df["type"])
+    final_df.drop(columns=["time_agg", "type_agg"], inplace=True)
+    return final_df.sort_values("date").reset_index(drop=True)
+
+
+@pytest.fixture
+def records():
+    # 20230101: one video; 20230102-03: no videos; 20230104: two videos of
+    # mixed types; 20230105: three videos of one type; 20230106: one video
+    return pd.DataFrame(
+        [
+            ("20230104", "1830", "DJI"),
+            ("20230101", "0915", "Phone"),
+            ("20230105", "2210", "DJI"),
+            ("20230104", "0700", "Phone"),
+            ("20230105", "0605", "DJI"),
+            ("20230106", "1200", "DJI"),
+            ("20230105", "1315", "DJI"),
+        ],
+        columns=["date", "time", "type"],
+    )
+
+
+def rows(df):
+    return [tuple(row) for row in df[["date", "time", "type"]].itertuples(index=False)]
+
+
+def test_blank_policy_matches_legacy_loop(records):
+    result = time_parser.aggregate_by_date(records)
+    pd.testing.assert_frame_equal(result, legacy_aggregate(records))
+    assert rows(result) == [
+        ("20230101", "0915", "Phone"),
+        ("20230102", "", ""),
+        ("20230103", "", ""),
+        ("20230104", "", ""),
+        ("20230105", "", "DJI"),
+        ("20230106", "1200", "DJI"),
+    ]
+
+
+def test_blank_policy_is_the_default(records):
+    pd.testing.assert_frame_equal(
+        time_parser.aggregate_by_date(records),
+        time_parser.aggregate_by_date(records, policy="blank"),
+    )
+
+
+def test_earliest_policy_keeps_first_clip_of_the_day(records):
+    assert rows(time_parser.aggregate_by_date(records, policy="earliest")) == [
+        ("20230101", "0915", "Phone"),
+        ("20230102", "", ""),
+        ("20230103", "", ""),
+        ("20230104", "0700", "Phone"),
+        ("20230105", "0605", "DJI"),
+        ("20230106", "1200", "DJI"),
+    ]
+
+
+def test_latest_policy_keeps_last_clip_of_the_day(records):
+    assert rows(time_parser.aggregate_by_date(records, policy="latest")) == [
+        ("20230101", "0915", "Phone"),
+        ("20230102", "", ""),
+        ("20230103", "", ""),
+        ("20230104", "1830", "DJI"),
+        ("20230105", "2210", "DJI"),
+        ("20230106", "1200", "DJI"),
+    ]
+
+
+@pytest.mark.parametrize("policy", time_parser.DUPLICATE_POLICIES)
+def test_empty_records(policy):
+    empty = pd.DataFrame(columns=["date", "time", "type"])
+    result = time_parser.aggregate_by_date(empty, policy=policy)
+    assert result.empty
+    assert list(result.columns) == ["date", "time", "type"]
+
+
+def test_unknown_policy_raises(records):
+    with pytest.raises(ValueError, match="Unknown duplicate policy"):
+        time_parser.aggregate_by_date(records, policy="first")
+
+
+# ------------------------------
+# Probing: native MP4 reader, ffprobe fallback and the probe cache
+# ------------------------------
+FFPROBE_STUB = """#!{python}
+import os, sys
+path = sys.argv[-1]
+with open(os.path.join(os.path.dirname(__file__), "calls.log"), "a") as log:
+    log.write(os.path.basename(path) + "\\n")
+if "broken" in path:
+    sys.exit(1)
+sys.stdout.write(open(path).read())
+"""
+
+
+@pytest.fixture
+def stub_ffprobe(tmp_path, monkeypatch):
+    """An ffprobe on PATH that prints the file's contents (JSON) and logs each call."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "ffprobe"
+    script.write_text(FFPROBE_STUB.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    log = bin_dir / "calls.log"
+    return lambda: sorted(log.read_text().split()) if log.exists() else []
+
+
+PHONE_META = {"format": {"tags": {"creation_time": "2023-03-05T23:25:00.000000Z"}},
+              "streams": [{"codec_type": "video", "width": 1080, "height": 1920}]}
+
+
+@pytest.fixture
+def videos(tmp_path):
+    """A native MP4, a file only ffprobe can read and one nothing can."""
+    folder = tmp_path / "videos"
+    folder.mkdir()
+    write_clip(folder / "dji.mp4", CREATED, 3840, 2160)
+    (folder / "phone.mov").write_text(json.dumps(PHONE_META))
+    (folder / "broken.mp4").write_text("not a video")
+    return {name: str(folder / name) for name in ("dji.mp4", "phone.mov", "broken.mp4")}
+
+
+@pytest.fixture
+def native_reads(monkeypatch):
+    """Names of the files read by the native MP4 reader."""
+    calls = []
+    read_mp4_header = time_parser.read_mp4_header
+
+    def counting(filepath):
+        calls.append(os.path.basename(filepath))
+        return read_mp4_header(filepath)
+
+    monkeypatch.setattr(time_parser, "read_mp4_header", counting)
+    return calls
+
+
+def probe_all(videos, cache_path):
+    cache = time_parser.ProbeCache(str(cache_path))
+    return dict(time_parser.iter_probes(videos.values(), max_workers=2, cache=cache, verbose=False))
+
+
+def test_probes_read_mp4_headers_and_fall_back_to_ffprobe(videos, stub_ffprobe, native_reads, tmp_path):
+    results = probe_all(videos, tmp_path / "cache.jsonl")
+
+    assert results == {videos["dji.mp4"]: expected(CREATED, 3840, 2160), videos["phone.mov"]: PHONE_META}
+    assert sorted(native_reads) == ["broken.mp4", "dji.mp4", "phone.mov"]
+    # ffprobe only runs on the files the header reader rejects
+    assert stub_ffprobe() == ["broken.mp4", "phone.mov"]
+
+
+def test_second_run_reads_from_the_cache(videos, stub_ffprobe, native_reads, tmp_path):
+    first = probe_all(videos, tmp_path / "cache.jsonl")
+    native_reads.clear()
+
+    assert probe_all(videos, tmp_path / "cache.jsonl") == first
+    # Only the file that failed is probed again
+    assert native_reads == ["broken.mp4"]
+    assert stub_ffprobe() == ["broken.mp4", "broken.mp4", "phone.mov"]
+
+
+def test_changed_file_is_probed_again(videos, stub_ffprobe, native_reads, tmp_path):
+    probe_all(videos, tmp_path / "cache.jsonl")
+    del videos["broken.mp4"]
+    native_reads.clear()
+
+    # Same size, new mtime
+    st = os.stat(videos["dji.mp4"])
+    os.utime(videos["dji.mp4"], ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    # New contents, new size
+    edited = {**PHONE_META, "streams": [{"codec_type": "video", "width": 3840, "height": 2160}]}
+    with open(videos["phone.mov"], "w") as f:
+        f.write(json.dumps(edited))
+
+    results = probe_all(videos, tmp_path / "cache.jsonl")
+    assert results[videos["phone.mov"]] == edited
+    assert sorted(native_reads) == ["dji.mp4", "phone.mov"]
+    assert stub_ffprobe() == ["broken.mp4", "phone.mov", "phone.mov"]
+
+    # The latest entry for each path wins when the cache is reloaded
+    cache = time_parser.ProbeCache(str(tmp_path / "cache.jsonl"))
+    assert cache.get(videos["phone.mov"]) == edited
+
+
+def test_probes_stream_through_a_small_pool(tmp_path, stub_ffprobe):
+    paths = []
+    for i in range(25):
+        path = tmp_path / f"clip{i:02d}.mov"
+        path.write_text(json.dumps({"format": {"tags": {}}, "streams": [], "index": i}))
+        paths.append(str(path))
+
+    results = dict(time_parser.iter_probes(iter(paths), max_workers=3, verbose=False))
+    assert sorted(results) == paths
+    assert all(results[path]["index"] == i for i, path in enumerate(paths))
+
+
+# ------------------------------
+# main: resuming from the records file
+# ------------------------------
+def clip_at(folder, name, stamp):
+    """A native MP4 in folder created at stamp (UTC, ISO 8601)."""
+    folder.mkdir(exist_ok=True)
+    write_clip(folder / name, MP4_EPOCH_OFFSET + int(pd.Timestamp(stamp).timestamp()), 3840, 2160)
+
+
+def run(tmp_path, *roots, extra=()):
+    output = tmp_path / "output.csv"
+    time_parser.main([*map(str, roots), "-o", str(output), "--cache", str(tmp_path / "cache.jsonl"), *extra])
+    return rows(pd.read_csv(output, dtype=str, keep_default_na=False))
+
+
+def test_second_run_on_another_root_leaves_out_the_first(tmp_path):
+    clip_at(tmp_path / "2022", "a.mp4", "2022-06-01T17:00Z")
+    clip_at(tmp_path / "2022", "b.mp4", "2022-06-02T17:30Z")
+    clip_at(tmp_path / "2023", "c.mp4", "2023-03-05T18:25Z")
+
+    assert run(tmp_path, tmp_path / "2022") == [("20220601", "1200", "DJI"), ("20220602", "1230", "DJI")]
+    assert run(tmp_path, tmp_path / "2023") == [("20230305", "1325", "DJI")]
+    # Both years' records stay in the records file, so going back resumes
+    records = pd.read_csv(tmp_path / "output.records.csv", dtype=str)
+    assert len(records) == 3
+    assert run(tmp_path, tmp_path / "2022") == [("20220601", "1200", "DJI"), ("20220602", "1230", "DJI")]
+    assert len(pd.read_csv(tmp_path / "output.records.csv", dtype=str)) == 3
+
+
+def test_deleted_videos_drop_out_of_the_output(tmp_path):
+    clip_at(tmp_path / "videos", "a.mp4", "2022-06-01T17:00Z")
+    clip_at(tmp_path / "videos", "b.mp4", "2022-06-03T17:30Z")
+    assert len(run(tmp_path, tmp_path / "videos")) == 3
+
+    os.remove(tmp_path / "videos" / "b.mp4")
+    assert run(tmp_path, tmp_path / "videos") == [("20220601", "1200", "DJI")]
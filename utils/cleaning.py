@@ -0,0 +1,54 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Cell values the sheet uses for "no data" / formula errors. A row holding
+# any of them (after trimming) is dropped by clean_data.
+SENTINELS = ("", " ", "#VALUE!")
+
+
+def sentinel_cells(df: pd.DataFrame, sentinels=SENTINELS) -> pd.DataFrame:
+    """
+    Boolean frame marking the cells of df that hold a sentinel value.
+
+    Only object/string columns are checked, one vectorized isin() per
+    column: numeric cells and NaN can never stringify to a sentinel, so
+    skipping them matches the row-wise `row.astype(str).isin(...)` check.
+    """
+    str_cols = df.select_dtypes(include=["object", "string"]).columns
+    return pd.DataFrame(
+        {col: df[col].isin(sentinels).to_numpy(dtype=bool) for col in str_cols},
+        index=df.index,
+        columns=str_cols,
+    )
+
+
+def sentinel_report(cells: pd.DataFrame) -> pd.Series:
+    """
+    For each row with at least one sentinel cell, the comma-separated names
+    of the columns that tripped, indexed like the rows they describe.
+    """
+    flagged = cells[cells.any(axis=1)]
+    if flagged.empty:
+        return pd.Series([], index=flagged.index, dtype=object)
+    # Matrix product of the boolean cells with "name," strings concatenates
+    # the names of the True columns row by row
+    names = np.array([f"{col}," for col in flagged.columns], dtype=object)
+    joined = flagged.to_numpy(dtype=object).dot(names)
+    return pd.Series(joined, index=flagged.index).str.rstrip(",")
+
+
+def drop_sentinel_rows(df: pd.DataFrame, sentinels=SENTINELS):
+    """
+    Return (df without rows holding a sentinel, report of the dropped rows).
+    The per-column counts are logged for diagnostics.
+    """
+    cells = sentinel_cells(df, sentinels)
+    tripped = cells.any(axis=1).to_numpy()
+    if tripped.any():
+        counts = cells.sum()
+        logger.info("Sentinel cells per column: %s", counts[counts > 0].to_dict())
+    return df[~tripped], sentinel_report(cells)
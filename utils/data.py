@@ -1,8 +1,42 @@
+import numpy as np
 import pandas as pd
-import os, time
+import os, time, datetime
+import csv, io, json, hashlib
+import logging
+import contextlib
+import tempfile
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
 
-LOCAL_CSV = "local_data.csv"
+from utils.cleaning import drop_sentinel_rows
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, writes are still atomic
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Copy-on-write: frames derived from the shared lift frame (column views,
+# filtered rows, frames a chart adds columns to) never write through to it,
+# so the charts can share one frame, and be built concurrently, without
+# defensive copies.
+pd.set_option("mode.copy_on_write", True)
+
+LOCAL_CSV = "data/local_data.csv"
+# Cleaned, typed copies of the CSV, one per distinct CSV content
+CACHE_DIR = os.environ.get("PHDED_CACHE_DIR", "data/cache")
+# Bump when clean_data changes so cached frames from older code are not reused
+CLEAN_CACHE_VERSION = 1
 ONE_DAY_IN_SECONDS = 86400
+HTTP_TIMEOUT_SECONDS = 30
+
+# Day Number 1 corresponds to 2021-12-29
+START_DATE = datetime.datetime(2021, 12, 29)
+
+# Columns added by build_lift_frame
+LIFT_FRAME_COLUMNS = ["DecimalHour", "Hour", "Minute", "DayOfWeek", "DateTime", "QuarterBin"]
 
 def is_data_stale(file_path):
     """Return True if file doesn't exist or is older than a day."""
@@ -11,15 +45,414 @@ def is_data_stale(file_path):
     file_age = time.time() - os.path.getmtime(file_path)
     return file_age > ONE_DAY_IN_SECONDS
 
-def load_data(csv_url: str) -> pd.DataFrame:
+def file_digest(file_path):
+    """SHA-256 hex digest of a file's contents, or None if it doesn't exist."""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def ensure_fresh(csv_url: str, local_csv: str = LOCAL_CSV) -> None:
+    """Refresh local_csv from csv_url if it is missing or stale, keeping the old copy on failure."""
+    if is_data_stale(local_csv):
+        logger.info("Local CSV %s missing or stale, refreshing", local_csv)
+        try:
+            refresh_data(csv_url, local_csv)
+        except (OSError, ValueError) as exc:
+            if not os.path.exists(local_csv):
+                raise
+            logger.warning("Refresh of %s failed, using local copy: %s", local_csv, exc)
+
+def _unique_tmp(path):
+    """
+    A new empty file next to path, named "<name>.<random>.tmp", for one
+    writer to fill and os.replace onto path. Every worker refreshing or
+    caching at the same moment gets its own, so none can truncate another's
+    half-written file.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{name}.", suffix=".tmp")
+    os.close(fd)
+    os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; match a normally written file
+    return tmp_path
+
+def _replace_from_tmp(path, write):
+    """Call write(tmp_path) on a _unique_tmp for path, then move it into place."""
+    tmp_path = _unique_tmp(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+# -------------------------------------------------------------------------
+# Cleaned-frame cache
+# -------------------------------------------------------------------------
+# Parsing and cleaning the CSV dominates a cold start, but its result only
+# changes when the CSV does. The cleaned frame is stored under a key made
+# from the CSV's SHA-256, so a warm start loads typed columns directly and
+# an updated CSV simply misses the cache. Feather is used when pyarrow is
+# installed, pickle otherwise.
+
+try:
+    import pyarrow  # noqa: F401
+    _CACHE_FORMAT = "feather"
+except ImportError:
+    _CACHE_FORMAT = "pkl"
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir, f"clean-v{CLEAN_CACHE_VERSION}-{digest[:16]}.{_CACHE_FORMAT}")
+
+def _read_cached_frame(path):
+    if _CACHE_FORMAT == "feather":
+        # Feather needs a default index; the original row labels are stored as a column
+        return pd.read_feather(path).set_index("__index__").rename_axis(None)
+    return pd.read_pickle(path)
+
+def _write_cached_frame(df, path):
+    def write(tmp_path):
+        if _CACHE_FORMAT == "feather":
+            df.reset_index(names="__index__").to_feather(tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+    _replace_from_tmp(path, write)
+    # Drop frames cached for earlier versions of the CSV, leaving alone the
+    # temp files other workers may be writing at the same moment
+    cache_dir, current = os.path.split(path)
+    for name in os.listdir(cache_dir):
+        if name.startswith("clean-") and name != current and not name.endswith(".tmp"):
+            with contextlib.suppress(FileNotFoundError):  # another worker pruned it first
+                os.remove(os.path.join(cache_dir, name))
+
+def load_clean_data(csv_url: str, local_csv: str = LOCAL_CSV, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """
+    Return the cleaned lift sheet, refreshing local_csv from csv_url first
+    if it is missing or stale. Served from the on-disk cache when the CSV's
+    contents have been cleaned before.
     """
-    1) Check if local CSV is stale.
-    2) If stale or missing, fetch from the given csv_url and save locally.
-    3) Return the DataFrame.
+    ensure_fresh(csv_url, local_csv)
+    path = _cache_path(file_digest(local_csv), cache_dir)
+    if os.path.exists(path):
+        try:
+            df = _read_cached_frame(path)
+            logger.info("Loaded cleaned data from cache: source=%s rows=%d columns=%d",
+                        path, df.shape[0], df.shape[1])
+            return df
+        except Exception:
+            logger.exception("Reading cached frame %s failed, re-cleaning", path)
+
+    df = pd.read_csv(local_csv)
+    logger.info("Loaded data: source=%s rows=%d columns=%d", local_csv, df.shape[0], df.shape[1])
+    df = clean_data(df)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_cached_frame(df, path)
+    except Exception:
+        # The cache is optional: read-only deployments, and frames pyarrow
+        # cannot store (e.g. mixed-type object columns), work without it
+        logger.exception("Could not cache cleaned data at %s", path)
+    return df
+
+# -------------------------------------------------------------------------
+# Incremental refresh
+# -------------------------------------------------------------------------
+# The sheet is laid out one row per day, with rows for future days already
+# present but blank. Rows up to the last complete day (the "watermark") are
+# treated as final; a refresh keeps them as they are on disk and only
+# replaces the rows after it. The watermark and the HTTP validators of the
+# last download live in a JSON sidecar next to the CSV.
+
+def _meta_path(local_csv):
+    return local_csv + ".meta.json"
+
+def _read_meta(local_csv):
+    try:
+        with open(_meta_path(local_csv)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_atomic(path, text):
+    def write(tmp_path):
+        with open(tmp_path, "w", newline="") as f:
+            f.write(text)
+    _replace_from_tmp(path, write)
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive inter-process lock on path + ".lock" (no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _parse_day(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def _last_complete_day(header, rows):
+    """Highest Day Number such that it and every day before it has a Top Set Weight."""
+    day_idx = header.index("Day Number")
+    weight_idx = header.index("Top Set Weight")
+    watermark = 0
+    for row in rows:
+        day = _parse_day(row[day_idx])
+        if day is None:
+            continue
+        weight = row[weight_idx].strip()
+        if not weight or weight == "#VALUE!":
+            break
+        watermark = day
+    return watermark
+
+def merge_new_rows(header, local_rows, remote_rows, watermark):
+    """
+    Keep local rows up to and including the watermark day and take the
+    remote rows after it. Returns (rows, number of remote rows taken).
+    """
+    day_idx = header.index("Day Number")
+
+    def after_watermark(row):
+        day = _parse_day(row[day_idx])
+        return day is not None and day > watermark
+
+    kept = [row for row in local_rows if not after_watermark(row)]
+    new = [row for row in remote_rows if after_watermark(row)]
+    return kept + new, len(new)
+
+def _conditional_get(url, meta, timeout):
+    """GET url with the stored validators. Returns (body, response headers), or None on 304."""
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304:
+            return None
+        raise
+
+def refresh_data(csv_url: str, local_csv: str = LOCAL_CSV, full: bool = False,
+                 timeout: float = HTTP_TIMEOUT_SECONDS) -> int:
+    """
+    Bring local_csv up to date with the sheet at csv_url and return the
+    number of rows that changed (0 if nothing did).
+
+    The request carries If-None-Match/If-Modified-Since from the previous
+    download, so an unchanged sheet costs a 304 and no body. Otherwise only
+    rows after the last ingested Day Number are taken from the download;
+    full=True (or a changed header) rewrites the whole file.
+
+    Every worker runs its own refresher, so the whole read-merge-write runs
+    under a lock on local_csv: a worker that waited then sends the
+    validators the previous one just stored and gets a 304.
     """
-    if is_data_stale(LOCAL_CSV):
-        df = pd.read_csv(csv_url)
-        df.to_csv(LOCAL_CSV, index=False)
+    with _file_lock(local_csv):
+        return _refresh_data(csv_url, local_csv, full, timeout)
+
+def _refresh_data(csv_url, local_csv, full, timeout):
+    have_local = os.path.exists(local_csv)
+    meta = _read_meta(local_csv) if have_local and not full else {}
+
+    fetched = _conditional_get(csv_url, meta, timeout)
+    if fetched is None:
+        logger.info("Sheet unchanged since last refresh (304)")
+        os.utime(local_csv)  # reset the staleness clock
+        return 0
+    body, headers = fetched
+
+    remote = list(csv.reader(io.StringIO(body.decode("utf-8"))))
+    if not remote:
+        raise ValueError(f"Empty CSV downloaded from {csv_url}")
+    header, remote_rows = remote[0], remote[1:]
+
+    local_header, local_rows = None, []
+    if have_local and not full:
+        with open(local_csv, newline="") as f:
+            local = list(csv.reader(f))
+        if local:
+            local_header, local_rows = local[0], local[1:]
+
+    if local_header == header:
+        watermark = meta.get("last_day_number")
+        if watermark is None:
+            watermark = _last_complete_day(header, local_rows)
+        rows, taken = merge_new_rows(header, local_rows, remote_rows, watermark)
+        changed = sum(1 for a, b in zip(rows, local_rows) if a != b) + abs(len(rows) - len(local_rows))
+    else:
+        rows, taken = remote_rows, len(remote_rows)
+        changed = len(rows)
+
+    if changed:
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+        _write_atomic(local_csv, out.getvalue())
     else:
-        df = pd.read_csv(LOCAL_CSV)
+        os.utime(local_csv)
+
+    new_meta = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "last_day_number": _last_complete_day(header, rows),
+    }
+    _write_atomic(_meta_path(local_csv), json.dumps(new_meta))
+    logger.info("Refreshed %s: downloaded %d bytes, took %d rows after day %s, %d rows changed",
+                local_csv, len(body), taken, meta.get("last_day_number"), changed)
+    return changed
+
+def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Trim string columns, drop rows holding empty/"#VALUE!" cells, convert the
+    numeric columns and drop rows without a Top Set Weight.
+    """
+    initial_count = len(df)
+
+    # Replace deprecated applymap with trimming only object/string columns
+    str_cols = df.select_dtypes(include=["object"]).columns
+    if len(str_cols) > 0:
+        df[str_cols] = df[str_cols].apply(lambda s: s.str.strip())
+
+    # Now filter out rows that contain either an empty string or "#VALUE!" in any column.
+    df, dropped = drop_sentinel_rows(df)
+    if len(dropped):
+        logger.debug("Dropped rows and the columns that tripped:\n%s", dropped.to_string())
+    logger.info("After trimming & masking: rows=%d (removed %d)", len(df), initial_count - len(df))
+
+    # Convert some columns to numeric if they exist
+    for col in ["Day Number", "Average Weight", "Top Set Weight", "Day"]:
+        if col in df.columns:
+            before = df[col].notna().sum()
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+            after = df[col].notna().sum()
+            logger.info("Converted column '%s' to numeric: non-null before=%d after=%d", col, before, after)
+
+    # Record shape before dropna
+    shape_before_drop = df.shape
+    df = df.dropna(subset=["Top Set Weight"])
+    logger.info("After dropna(['Top Set Weight']): rows=%d (dropped %d)", len(df), shape_before_drop[0] - len(df))
     return df
+
+def summarize(df: pd.DataFrame) -> dict:
+    """
+    Header statistics: day count, most recent lift and its date, cumulative
+    top set weight and the number of days not yet entered.
+    """
+    day_number = (datetime.datetime.today() - START_DATE).days
+
+    # Compute "Most Recent Lift: YxZ" (robust to NaNs)
+    most_recent_lift = "N/A"
+    most_recent_date = "N/A"
+    if 'Top Set Weight' in df.columns and 'Number of Reps' in df.columns:
+        valid_mask = df['Top Set Weight'].notna() & df['Number of Reps'].notna()
+        if valid_mask.any():
+            last = df.loc[valid_mask].iloc[-1]
+            try:
+                most_recent_lift = f"{int(last['Top Set Weight'])}lbs x{int(last['Number of Reps'])}"
+            except (ValueError, TypeError):
+                most_recent_lift = "N/A"
+            most_recent_date_raw = last.get('Date', None)
+            if pd.notna(most_recent_date_raw):
+                try:
+                    most_recent_date = pd.to_datetime(str(most_recent_date_raw), format="%Y%m%d").strftime("%m.%d.%y")
+                except Exception:
+                    try:
+                        most_recent_date = pd.to_datetime(most_recent_date_raw).strftime("%m.%d.%y")
+                    except Exception:
+                        most_recent_date = str(most_recent_date_raw)
+
+    # Compute "Total Weight Lifted: W" (ignore NaNs)
+    if 'Top Set Weight' in df.columns and 'Number of Reps' in df.columns:
+        total_weight_lifted = int((df['Top Set Weight'].fillna(0) * df['Number of Reps'].fillna(0)).sum())
+    else:
+        total_weight_lifted = "N/A"
+
+    return {
+        "day_number": day_number,
+        "most_recent_lift": most_recent_lift,
+        "most_recent_date": most_recent_date,
+        "total_weight_lifted": total_weight_lifted,
+        "missing_lifts": day_number - len(df),
+    }
+
+def build_lift_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the cleaned lifts enriched with the time columns the charts share,
+    parsed once with vectorized operations:
+      - DecimalHour: military 'Time' (e.g. 1436.0) as decimal hours (14.6)
+      - Hour, Minute: the clock time's components
+      - DayOfWeek: Monday=0 .. Sunday=6, from the YYYYMMDD 'Date'
+      - DateTime: 'Date' plus the clock time
+      - QuarterBin: quarter-hour of the day, 0..95
+    Rows without a parseable Time/Date get NaN/NaT in the derived columns.
+    The charts treat the result as read-only.
+    """
+    lift = df.copy()
+
+    time_col = df["Time"]
+    if not pd.api.types.is_numeric_dtype(time_col):
+        time_col = time_col.astype(str).str.replace(":", "", regex=False)
+    mil_time = np.floor(pd.to_numeric(time_col, errors="coerce"))
+    hour = mil_time // 100
+    minute = mil_time % 100
+
+    date_num = pd.to_numeric(df["Date"], errors="coerce").astype("Int64")
+    date = pd.to_datetime(date_num.astype(str), format="%Y%m%d", errors="coerce")
+
+    lift["DecimalHour"] = hour + minute / 60.0
+    lift["Hour"] = hour
+    lift["Minute"] = minute
+    lift["DayOfWeek"] = date.dt.weekday
+    lift["DateTime"] = date + pd.to_timedelta(hour * 60 + minute, unit="min")
+    lift["QuarterBin"] = hour * 4 + minute // 15
+    return lift
+
+def as_lift_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df if it already carries the lift frame columns, otherwise build them."""
+    if all(col in df.columns for col in LIFT_FRAME_COLUMNS):
+        return df
+    return build_lift_frame(df)
+
+@dataclass(frozen=True)
+class LiftData:
+    """
+    Read-only handle on one data version's lift frame.
+
+    frame and timed hand out a new shallow view on every access. Under
+    copy-on-write a chart may add or overwrite columns on its view without
+    affecting the shared frame or any other chart, and nothing is copied
+    unless it does.
+    """
+    _frame: pd.DataFrame
+    _timed: pd.DataFrame
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "LiftData":
+        lift = build_lift_frame(df)
+        timed = lift.dropna(subset=["Time"])
+        logger.info("df for time-based charts (df2): rows=%d (original df rows=%d)", len(timed), len(lift))
+        return cls(lift, timed)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """All cleaned lifts with the lift frame columns."""
+        return self._frame.copy(deep=False)
+
+    @property
+    def timed(self) -> pd.DataFrame:
+        """Lifts with a recorded Time (the time-based charts' input)."""
+        return self._timed.copy(deep=False)
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Most points a time-series trace is drawn with; beyond this the series is
+# reduced with LTTB, and zooming in fetches the full-resolution points for
+# the visible range (see the relayout callbacks in app.py)
+MAX_POINTS = int(os.environ.get("PHDED_MAX_POINTS", "2000"))
+
+
+def _as_float(values):
+    """x values (numbers or datetimes) as float64, for area computations."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the n_out points that Largest-Triangle-Three-Buckets keeps
+    from the series (x, y), which must be sorted by x and free of NaN.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the average of the next bucket, which
+    preserves peaks and troughs far better than taking every k-th point.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def decimate_indices(x, y, max_points=None, x_range=None):
+    """
+    Indices (into x/y, sorted by x) of the points to draw for a trace: the
+    points inside x_range (all of them when x_range is None, plus one
+    neighbour on each side so lines run off the edge of the view), reduced
+    with LTTB to at most max_points (default MAX_POINTS). Below the limit
+    nothing is dropped, not even NaN gaps.
+    """
+    max_points = max_points or MAX_POINTS
+    x_float = _as_float(x)
+    candidates = np.arange(len(x_float))
+
+    if x_range is not None:
+        lo, hi = _as_float(np.asarray(x_range, dtype=np.asarray(x).dtype))
+        inside = np.flatnonzero((x_float >= lo) & (x_float <= hi))
+        if not len(inside):
+            return inside
+        candidates = candidates[max(inside[0] - 1, 0):min(inside[-1] + 1, len(x_float) - 1) + 1]
+
+    if len(candidates) <= max_points:
+        return candidates
+    y = np.asarray(y, dtype=float)
+    finite = candidates[np.isfinite(y[candidates]) & np.isfinite(x_float[candidates])]
+    return finite[lttb_indices(x_float[finite], y[finite], max_points)]
+
+
+def relayout_x_range(relayout_data, axis="xaxis"):
+    """
+    The x range a Plotly relayout event zoomed/panned `axis` to, as a
+    (start, end) pair of raw values; "full" when the axis was reset to
+    autorange; None when the event does not concern the axis.
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get(f"{axis}.autorange"):
+        return "full"
+    if f"{axis}.range[0]" in relayout_data:
+        return relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"]
+    if f"{axis}.range" in relayout_data:
+        return tuple(relayout_data[f"{axis}.range"])
+    return None
+
+
+def widen_range(x_range, is_datetime=False):
+    """
+    x_range extended by half its width on each side, so a short pan after
+    zooming still has full-resolution points to show.
+    """
+    lo, hi = x_range
+    if is_datetime:
+        lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+    else:
+        lo, hi = float(lo), float(hi)
+    pad = (hi - lo) / 2
+    lo, hi = lo - pad, hi + pad
+    if is_datetime:
+        return np.datetime64(lo.to_datetime64(), "ns"), np.datetime64(hi.to_datetime64(), "ns")
+    return lo, hi
@@ -0,0 +1,50 @@
+import functools
+
+import numpy as np
+
+# Hover text for the binned heatmaps (charts 2, 6 and 8), built a whole grid
+# at a time with NumPy string ops instead of formatting every bin in a loop.
+# Arguments broadcast like any NumPy operands: pass per-column labels as
+# labels[:, None] and per-row labels as labels[None, :].
+
+
+def concat(*parts) -> np.ndarray:
+    """Element-wise concatenation of string arrays/scalars, broadcast together."""
+    return functools.reduce(np.char.add, (np.asarray(part, dtype=str) for part in parts))
+
+
+def zero_pad(values, width: int = 2) -> np.ndarray:
+    """Integers as zero-padded strings, e.g. 7 -> "07"."""
+    return np.char.zfill(np.asarray(values).astype(int).astype(str), width)
+
+
+def ampm_labels(decimal_hours) -> np.ndarray:
+    """Decimal hours as "H:MM AM/PM" labels; hour 24 wraps to 12:00 AM."""
+    decimal_hours = np.asarray(decimal_hours, dtype=float)
+    hour = decimal_hours.astype(int)
+    minute = np.round((decimal_hours - hour) * 60).astype(int)
+    period = np.where((hour < 12) | (hour == 24), "AM", "PM")
+    hour_12 = hour % 12
+    hour_12 = np.where(hour_12 == 0, 12, hour_12)
+    return concat(hour_12.astype(str), ":", zero_pad(minute), " ", period)
+
+
+def count_labels(counts, singular: str = "lift", plural: str = "lifts") -> np.ndarray:
+    """Bin counts (NaN meaning 0) as "1 lift" / "N lifts"."""
+    counts = np.nan_to_num(np.asarray(counts, dtype=float)).astype(int)
+    return concat(counts.astype(str), " ", np.where(counts == 1, singular, plural))
+
+
+def hover_grid(*lines, where=None) -> np.ndarray:
+    """
+    Grid of hover labels, the given lines joined with <br>; cells where
+    `where` is False are left blank. Returned as an object array, which
+    Plotly serializes like a nested list.
+    """
+    parts = [lines[0]]
+    for line in lines[1:]:
+        parts += ["<br>", line]
+    text = concat(*parts)
+    if where is not None:
+        text = np.where(where, text, "")
+    return text.astype(object)
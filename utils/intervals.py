@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+
+def rest_hours(day_number, decimal_hour, max_gap_days: int = 1) -> np.ndarray:
+    """
+    Hours between each lift and the one before it, for arrays already
+    sorted by (day number, decimal hour).
+
+    Each lift is compared with the previous row only: the interval is
+    gap_days * 24 - previous hour + current hour when the previous lift was
+    1..max_gap_days days earlier, and NaN otherwise (the first row, a second
+    lift on the same day, or a longer gap). The default of one day counts
+    only rest between consecutive days; max_gap_days=2 also counts rest
+    across a skipped day, and so on.
+    """
+    day = np.asarray(day_number, dtype=float)
+    hour = np.asarray(decimal_hour, dtype=float)
+    rest = np.full(len(day), np.nan)
+    if len(day) < 2:
+        return rest
+
+    gap = day[1:] - day[:-1]
+    valid = (gap >= 1) & (gap <= max_gap_days)
+    rest[1:] = np.where(valid, gap * 24 - hour[:-1] + hour[1:], np.nan)
+    return rest
+
+
+def add_rest_time(df: pd.DataFrame, max_gap_days: int = 1, column: str = "Rest Time") -> pd.DataFrame:
+    """
+    Return df sorted by Day Number and DecimalHour (with a fresh index) and
+    the interval since the previous lift added as `column`, in hours.
+    """
+    df = df.sort_values(["Day Number", "DecimalHour"]).reset_index(drop=True)
+    df[column] = rest_hours(df["Day Number"].to_numpy(), df["DecimalHour"].to_numpy(), max_gap_days)
+    return df
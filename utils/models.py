@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.mixture import GaussianMixture
+
+logger = logging.getLogger(__name__)
+
+# Fitted mixtures kept per process, so rebuilding the registry after a data
+# refresh does not refit models whose input values did not change.
+MAX_CACHED_FITS = 32
+# Threads used by bic_sweep(); one fit per component count
+SWEEP_WORKERS = int(os.environ.get("PHDED_SWEEP_WORKERS", "5"))
+
+_fits = OrderedDict()   # (key, n_components, fingerprint) -> GaussianMixture
+_latest = {}            # (key, n_components) -> (training data, GaussianMixture)
+_lock = threading.Lock()
+
+
+def _fingerprint(X):
+    return hashlib.sha256(np.ascontiguousarray(X, dtype=float).tobytes()).hexdigest()
+
+
+def _warm_start_from(key, n_components, X):
+    """(data, model) of the previous fit for (key, n_components) if X only appends rows to its data."""
+    with _lock:
+        previous = _latest.get((key, n_components))
+    if previous is None:
+        return None
+    old_X, model = previous
+    if len(old_X) < len(X) and np.array_equal(old_X, X[:len(old_X)]):
+        return old_X, model
+    return None
+
+
+def fit_gmm(X, n_components, key, random_state=0):
+    """
+    Fit GaussianMixture(n_components) to X (shape (n_samples, n_features)).
+
+    key names the model ("rest_time", "hour_of_day", ...). A fit for the same
+    key, component count and data is returned from the cache. When X extends
+    the data of the previous fit for that key with new rows, the fit starts
+    from the previous weights, means and precisions, which converges in a
+    few iterations instead of starting again from k-means.
+    """
+    X = np.asarray(X, dtype=float)
+    cache_key = (key, n_components, _fingerprint(X))
+    with _lock:
+        if cache_key in _fits:
+            _fits.move_to_end(cache_key)
+            return _fits[cache_key]
+
+    previous = _warm_start_from(key, n_components, X)
+    if previous is not None:
+        old_X, previous = previous
+        logger.info("Warm-starting %d-component '%s' fit from the fit on %d earlier rows",
+                    n_components, key, len(old_X))
+        gmm = GaussianMixture(
+            n_components=n_components,
+            random_state=random_state,
+            weights_init=previous.weights_,
+            means_init=previous.means_,
+            precisions_init=previous.precisions_,
+        )
+    else:
+        gmm = GaussianMixture(n_components=n_components, random_state=random_state)
+    gmm.fit(X)
+
+    with _lock:
+        _fits[cache_key] = gmm
+        while len(_fits) > MAX_CACHED_FITS:
+            _fits.popitem(last=False)
+        _latest[(key, n_components)] = (X, gmm)
+    return gmm
+
+
+def bic_sweep(X, components, key, random_state=0, max_workers=None):
+    """
+    Fit one mixture per component count concurrently and return
+    ({n: bic}, {n: model}) in the order of components.
+    """
+    X = np.asarray(X, dtype=float)
+    components = list(components)
+    with ThreadPoolExecutor(max_workers=max_workers or min(SWEEP_WORKERS, len(components)),
+                            thread_name_prefix="gmm-sweep") as pool:
+        models = dict(zip(components, pool.map(lambda n: fit_gmm(X, n, key, random_state), components)))
+    bic_values = {n: models[n].bic(X) for n in components}
+    return bic_values, models
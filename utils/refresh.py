@@ -0,0 +1,49 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LiveRegistry:
+    """
+    Holds the FigureRegistry currently being served and swaps in a rebuilt
+    one when the data changes. Readers take `current` once per request, so a
+    request in flight keeps the snapshot it started with.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._swap_lock = threading.Lock()
+        self.current = factory()
+
+    def rebuild(self):
+        """Build a replacement registry, reusing unaffected entries, then swap it in."""
+        with self._swap_lock:
+            previous = self.current
+            registry = self._factory(previous)
+            failed = registry.build_all()
+            registry.release_previous()
+            # A single reference assignment: readers see either snapshot, never a mix
+            self.current = registry
+            logger.info("Swapped in rebuilt figures (%d failed)", len(failed))
+            return registry
+
+
+def start_refresher(live, poll, interval):
+    """
+    Call poll() every interval seconds in a daemon thread and rebuild live
+    whenever it returns True (i.e. the source data changed).
+    """
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            try:
+                if poll():
+                    live.rebuild()
+            except Exception:
+                logger.exception("Background data refresh failed")
+
+    thread = threading.Thread(target=_run, name="data-refresher", daemon=True)
+    thread.start()
+    return stop
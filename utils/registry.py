@@ -0,0 +1,188 @@
+import importlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Threads used by build_all(); the chart builders are independent once the
+# lift frame exists, and numpy/scipy/sklearn release the GIL in their kernels.
+BUILD_WORKERS = int(os.environ.get("PHDED_BUILD_WORKERS", "4"))
+
+
+class FigureRegistry:
+    """
+    Lazily built, process-local store of the dashboard's data and figures.
+
+    Each entry is registered with a builder and the names of the entries it
+    depends on. Nothing is computed until an entry is first requested with
+    get(); the result is then kept for the lifetime of the registry. Builders
+    may be given as "module:function" strings so that chart modules (and their
+    heavy imports) are only loaded when a figure is actually built.
+
+    A dependency written as "entry.attribute" passes that attribute of the
+    entry's value, read afresh for each build (e.g. "lift.frame" gives every
+    chart its own view of the shared LiftData).
+
+    A registry built to replace another (previous=...) reuses every value
+    whose inputs are unchanged, so a data refresh only rebuilds the figures
+    the new rows actually affect. Entries without dependencies (the data
+    loaders) are always rebuilt, as are entries that fell back to a
+    placeholder, or were built from one, so a transient failure does not
+    outlive the registry it happened in.
+    """
+
+    def __init__(self, previous=None):
+        self._entries = {}
+        self._values = {}
+        self._locks = {}
+        self._previous = previous
+        self._fingerprints = {}
+        self._fell_back = set()
+
+    def register(self, name, builder, depends_on=(), fallback=None):
+        """
+        Register builder(*[get(d) for d in depends_on]) under name.
+
+        If the build (or one of its dependencies) raises and a fallback is
+        given, the error is logged and fallback(exc) is stored instead, so one
+        broken chart degrades to a placeholder rather than failing the page.
+        """
+        self._entries[name] = (builder, tuple(depends_on), fallback)
+        self._locks[name] = threading.Lock()
+
+    def names(self):
+        return list(self._entries)
+
+    def is_built(self, name):
+        return name in self._values
+
+    def get(self, name):
+        """Return the value for name, building it (and its dependencies) on first use."""
+        if name in self._values:
+            return self._values[name]
+        if name not in self._entries:
+            raise KeyError(f"Unknown registry entry: {name}")
+
+        # Per-entry lock: concurrent callers wait for a single build
+        with self._locks[name]:
+            if name not in self._values:
+                builder, depends_on, fallback = self._entries[name]
+                if self._reusable(name):
+                    logger.info("Reusing '%s', its inputs are unchanged", name)
+                    self._values[name] = self._previous.get(name)
+                    return self._values[name]
+                start = time.perf_counter()
+                try:
+                    args = [self._dependency(dep) for dep in depends_on]
+                    # Time the build itself, not the wait for dependencies
+                    start = time.perf_counter()
+                    value = _resolve(builder)(*args)
+                except Exception as exc:
+                    if fallback is None:
+                        raise
+                    logger.exception("Building '%s' failed, using placeholder", name)
+                    value = fallback(exc)
+                    self._fell_back.add(name)
+                logger.info("Built '%s' in %.3fs", name, time.perf_counter() - start)
+                self._values[name] = value
+        return self._values[name]
+
+    def _dependency(self, dep):
+        name, _, attribute = dep.partition(".")
+        value = self.get(name)
+        return getattr(value, attribute) if attribute else value
+
+    def signature(self, name, build=True):
+        """
+        Fingerprint of the inputs name is built from: a content hash for each
+        DataFrame dependency, the dependency's own signature for anything else.
+
+        With build=False nothing is built: None is returned if a dependency
+        has not been built yet.
+        """
+        parts = []
+        for dep in self._entries[name][1]:
+            if dep not in self._fingerprints:
+                dep_name = dep.partition(".")[0]
+                if not build and not self.is_built(dep_name):
+                    return None
+                value = self._dependency(dep)
+                if isinstance(value, pd.DataFrame):
+                    fingerprint = (
+                        tuple(value.columns),
+                        int(pd.util.hash_pandas_object(value, index=True).sum()),
+                    )
+                else:
+                    fingerprint = self.signature(dep_name, build)
+                    if fingerprint is None:
+                        return None
+                self._fingerprints[dep] = fingerprint
+            parts.append((dep, self._fingerprints[dep]))
+        return tuple(parts)
+
+    def fell_back(self, name):
+        """True if name, or anything it was built from, holds a fallback value."""
+        if name in self._fell_back:
+            return True
+        return any(self.fell_back(dep.partition(".")[0]) for dep in self._entries[name][1])
+
+    def _reusable(self, name):
+        previous = self._previous
+        if previous is None or not self._entries[name][1] or not previous.is_built(name):
+            return False
+        if previous.fell_back(name):
+            return False
+        # The previous registry is only read, never built on: its values
+        # would otherwise be computed from the new data
+        old = previous.signature(name, build=False)
+        if old is None:
+            return False
+        try:
+            return self.signature(name) == old
+        except Exception:
+            # A dependency failed to build; let the normal path handle it
+            return False
+
+    def release_previous(self):
+        """Drop the reference to the registry this one replaced."""
+        self._previous = None
+
+    def build_all(self, names=None, max_workers=None):
+        """
+        Build the given entries (default: all) concurrently on a thread pool,
+        in submission order, and return the names that failed.
+        """
+        names = list(names) if names is not None else self.names()
+        start = time.perf_counter()
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers or BUILD_WORKERS,
+                                thread_name_prefix="figure-build") as pool:
+            futures = {name: pool.submit(self.get, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception("Building '%s' failed", name)
+                    failed.append(name)
+        logger.info("Built %d entries in %.3fs (%d failed)",
+                    len(names), time.perf_counter() - start, len(failed))
+        return failed
+
+    def warm_up(self, names=None):
+        """Run build_all() in a background daemon thread."""
+        thread = threading.Thread(target=self.build_all, args=(names,), name="figure-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+
+def _resolve(builder):
+    """Turn a "module:function" string into the function it names."""
+    if isinstance(builder, str):
+        module_name, func_name = builder.split(":")
+        return getattr(importlib.import_module(module_name), func_name)
+    return builder
@@ -0,0 +1,25 @@
+import os
+
+import plotly.graph_objects as go
+
+# Scatter backend: "svg" (go.Scatter), "webgl" (go.Scattergl) or "auto",
+# which switches to WebGL once a trace has more than WEBGL_THRESHOLD points.
+# SVG keeps one DOM node per marker and slows down badly past a thousand or
+# so, especially on phones; WebGL draws them all on one canvas.
+SCATTER_RENDERER = os.environ.get("PHDED_SCATTER_RENDERER", "auto")
+WEBGL_THRESHOLD = int(os.environ.get("PHDED_WEBGL_THRESHOLD", "1000"))
+
+
+def use_webgl(n_points: int, renderer: str = None) -> bool:
+    """Whether a scatter of n_points should be drawn with WebGL."""
+    renderer = renderer or SCATTER_RENDERER
+    if renderer not in ("auto", "svg", "webgl"):
+        raise ValueError(f"Unknown scatter renderer: {renderer!r}")
+    if renderer == "auto":
+        return n_points > WEBGL_THRESHOLD
+    return renderer == "webgl"
+
+
+def scatter_class(n_points: int, renderer: str = None):
+    """go.Scattergl or go.Scatter, per use_webgl(). Both take the same arguments here."""
+    return go.Scattergl if use_webgl(n_points, renderer) else go.Scatter
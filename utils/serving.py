@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass
+
+import dash
+import flask
+from plotly.io.json import to_json_plotly
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+GZIP_MIMETYPES = ("application/json", "application/javascript", "text/javascript", "text/css", "text/html")
+# Dash and Plotly bundles are static for the life of the process, so each is
+# compressed once per path (fingerprinted with the package version) and ETag
+# rather than on every uncached fetch
+BUNDLE_PATH = "/_dash-component-suites/"
+_gzipped_bundles = {}
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    """A JSON document serialized once, with its gzip encoding and ETag."""
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def from_obj(cls, obj) -> "EncodedPayload":
+        body = to_json_plotly(obj).encode("utf-8")
+        # mtime=0 keeps the gzip bytes identical across workers and rebuilds
+        gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        logger.info("Encoded payload: %d bytes, %d gzipped", len(body), len(gzipped))
+        return cls(body, gzipped, etag)
+
+    def response(self) -> flask.Response:
+        """
+        Serve the payload for the current request: 304 when the client's
+        If-None-Match already names this version, gzip when accepted.
+        """
+        request = flask.request
+        if self.etag in request.if_none_match:
+            response = flask.Response(status=304)
+        elif "gzip" in request.accept_encodings:
+            response = flask.Response(self.gzipped, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = flask.Response(self.body, mimetype="application/json")
+        response.set_etag(self.etag)
+        # Revalidate on every visit, the ETag changes with the data
+        response.headers["Cache-Control"] = "no-cache"
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+class CachedPayloadDash(dash.Dash):
+    """
+    Dash app that answers from EncodedPayloads kept per data version instead
+    of serializing on every request:
+
+    - /_dash-layout from layout_payload();
+    - a callback request from callback_payload(output), when that returns a
+      payload for the request's output (e.g. "graph-id.figure"). The payload
+      must hold the whole response body Dash would have sent, so it is only
+      for callbacks whose result does not depend on their inputs.
+
+    Without these hooks it behaves like dash.Dash.
+    """
+
+    layout_payload = None
+    callback_payload = None
+
+    def serve_layout(self):
+        if self.layout_payload is None:
+            return super().serve_layout()
+        return self.layout_payload().response()
+
+    def dispatch(self):
+        if self.callback_payload is not None:
+            body = flask.request.get_json(silent=True) or {}
+            payload = self.callback_payload(body.get("output"))
+            if payload is not None:
+                return payload.response()
+        return super().dispatch()
+
+
+def callback_response(component_id, prop, value):
+    """The body Dash sends for a single-output callback returning value."""
+    return {"multi": True, "response": {component_id: {prop: value}}}
+
+
+def gzip_response(response: flask.Response) -> flask.Response:
+    """
+    Flask after_request hook compressing text responses (callback JSON,
+    bundles) for clients that accept gzip. Bundles are compressed once and
+    kept in _gzipped_bundles.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in GZIP_MIMETYPES
+        or "gzip" not in flask.request.accept_encodings
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    if BUNDLE_PATH in flask.request.path:
+        key = (flask.request.path, response.get_etag()[0])
+        gzipped = _gzipped_bundles.get(key)
+        if gzipped is None:
+            gzipped = _gzipped_bundles[key] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    else:
+        gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(gzipped)
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response